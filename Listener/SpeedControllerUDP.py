@@ -167,9 +167,9 @@ def run_rtde_controller(stop_event: threading.Event):
                     # Non è necessariamente un errore di connessione, ma può indicare che la connessione è lenta
                     # o che il robot non sta inviando dati alla frequenza attesa.
                     logger.debug("[RTDE_TX] Nessun pacchetto RTDE ricevuto. Controlla connessione o frequenza.")
-                
-                # La pausa tra un ciclo e l'altro del loop RTDE è basata sulla frequenza
-                time.sleep(1 / RTDE_FREQUENCY)
+
+                # Nessuna pausa: receive() attende già il prossimo pacchetto, una
+                # sleep aggiuntiva raddoppierebbe il periodo del ciclo
 
         except ConnectionRefusedError as e:
             logger.error(f"[RTDE_TX] Connessione al robot rifiutata o non stabilita: {e}. Riprovo tra 10s...")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Decode and encode cost per data package for realistic recipes.
+
+    python bench_serialize.py [--json]
+"""
+
+import argparse
+import struct
+import timeit
+
+from common import load_recipe, report
+from rtde import serialize
+
+RECIPES = (
+    ("record_out", "record_configuration.xml", "out"),
+    ("control_state", "control_loop_configuration.xml", "state"),
+    ("control_setp", "control_loop_configuration.xml", "setp"),
+)
+
+
+def make_config(names, types, recipe_id=1):
+    config = serialize.DataConfig.unpack_recipe(
+        struct.pack(">B", recipe_id) + ",".join(types).encode("utf-8")
+    )
+    config.names = names
+    return config
+
+
+def make_payload(config):
+    values = [config.id]
+    for data_type in config.types:
+        size = serialize.get_item_size(data_type)
+        if data_type.endswith("D") or data_type == "DOUBLE":
+            values.extend([0.5] * size)
+        elif data_type == "BOOL":
+            values.extend([True] * size)
+        else:
+            values.extend([1] * size)
+    return config.codec.pack(*values)
+
+
+def ns_per_call(func, number):
+    # best of several repeats, the least disturbed by the rest of the system
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e9
+
+
+def run(number=20000):
+    results = {}
+    for label, filename, key in RECIPES:
+        names, types = load_recipe(filename, key)
+        config = make_config(names, types)
+        payload = make_payload(config)
+        generic = config.unpack(payload)
+        values = config.codec.unpack_from(payload)
+        record = serialize.DataObject.create_record_class(names, config.layout, config.id)
+        results[label] = {
+            "fields": len(names),
+            "bytes": len(payload),
+            "DataObject.unpack_ns": ns_per_call(
+                lambda: serialize.DataObject.unpack(
+                    values, names, types, config.layout
+                ),
+                number,
+            ),
+            "DataConfig.pack_ns": ns_per_call(lambda: config.pack(generic), number),
+        }
+        results[label]["DataConfig.unpack_generic_ns"] = ns_per_call(
+            lambda: config.unpack(payload), number
+        )
+        config.record = record
+        results[label]["DataConfig.unpack_ns"] = ns_per_call(
+            lambda: config.unpack(payload), number
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000, help="calls per repeat")
+    parser.add_argument("--json", help="print results as JSON", action="store_true")
+    args = parser.parse_args()
+    report("serialize", run(args.number), args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Per-cycle syscall count and latency of a lock-step RTDE control loop.
+
+A loopback controller sends the next data package as soon as the client
+sent its input packages for the current one, so every cycle is one
+receive() plus the send() calls of example_control_loop.py, or one
+send_many() call with --send-many. Socket calls
+are counted through a proxy; a socket with a timeout makes CPython poll
+the descriptor before every call, which is counted as well.
+
+    python bench_syscalls.py --cycles 20000
+    python bench_syscalls.py --cycles 20000 --send-many
+"""
+
+import argparse
+import select
+import socket
+import struct
+import threading
+import time
+
+from common import percentiles, report
+import rtde.rtde as rtde
+import rtde.serialize as serialize
+
+try:
+    import selectors
+except ImportError:
+    selectors = None
+
+STATE = ["target_q", "target_qd", "output_int_register_0"]
+STATE_TYPES = ["VECTOR6D", "VECTOR6D", "INT32"]
+SETP = ["input_double_register_%d" % i for i in range(6)]
+SETP_TYPES = ["DOUBLE"] * 6
+WATCHDOG = ["input_int_register_0"]
+WATCHDOG_TYPES = ["INT32"]
+
+
+def send_package(conn, command, payload=b""):
+    conn.sendall(struct.pack(">HB", 3 + len(payload), command) + payload)
+
+
+def lockstep_controller(listener, inputs_per_cycle):
+    conn, _ = listener.accept()
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    recipe = b"\x01" + ",".join(STATE_TYPES).encode()
+    config = serialize.DataConfig.unpack_recipe(recipe)
+    state = config.codec.pack(config.id, *([0.0] * 12 + [1]))
+    buf = b""
+    received = 0
+    recipes = [SETP_TYPES, WATCHDOG_TYPES]
+    while True:
+        data = conn.recv(65536)
+        if not data:
+            return
+        buf += data
+        while len(buf) >= 3:
+            size, command = struct.unpack_from(">HB", buf)
+            if len(buf) < size:
+                break
+            buf = buf[size:]
+            if command == rtde.Command.RTDE_REQUEST_PROTOCOL_VERSION:
+                send_package(conn, command, b"\x01")
+            elif command == rtde.Command.RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS:
+                send_package(conn, command, recipe)
+            elif command == rtde.Command.RTDE_CONTROL_PACKAGE_SETUP_INPUTS:
+                types = recipes.pop(0)
+                recipe_id = 2 - len(recipes)
+                send_package(
+                    conn, command, struct.pack(">B", recipe_id) + ",".join(types).encode()
+                )
+            elif command == rtde.Command.RTDE_CONTROL_PACKAGE_START:
+                send_package(conn, command, b"\x01")
+                # let the client consume the reply before the first package
+                time.sleep(0.01)
+                send_package(conn, rtde.Command.RTDE_DATA_PACKAGE, state)
+            elif command == rtde.Command.RTDE_CONTROL_PACKAGE_PAUSE:
+                send_package(conn, command, b"\x01")
+            elif command == rtde.Command.RTDE_DATA_PACKAGE:
+                received += 1
+                if received == inputs_per_cycle:
+                    received = 0
+                    send_package(conn, rtde.Command.RTDE_DATA_PACKAGE, state)
+
+
+class CountingSocket(object):
+    """Forwards to a socket and counts the calls that reach the kernel"""
+
+    CALLS = ("recv", "recv_into", "send", "sendall", "sendmsg")
+
+    def __init__(self, sock, counts):
+        self.__sock = sock
+        self.__counts = counts
+
+    def __getattr__(self, name):
+        attr = getattr(self.__sock, name)
+        if name not in self.CALLS:
+            return attr
+        counts = self.__counts
+
+        def counted(*args, **kwargs):
+            counts[name] = counts.get(name, 0) + 1
+            if self.__sock.gettimeout():
+                counts["poll"] = counts.get("poll", 0) + 1
+            return attr(*args, **kwargs)
+
+        return counted
+
+
+def count_calls(owner, name, counts, key):
+    """Count calls of owner.name, returns a function restoring it"""
+    original = getattr(owner, name)
+
+    def counted(*args, **kwargs):
+        counts[key] = counts.get(key, 0) + 1
+        return original(*args, **kwargs)
+
+    setattr(owner, name, counted)
+    return lambda: setattr(owner, name, original)
+
+
+def run(cycles=20000, warmup=1000, send_many=False):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    server = threading.Thread(target=lockstep_controller, args=(listener, 2))
+    server.daemon = True
+    server.start()
+
+    con = rtde.RTDE("127.0.0.1", listener.getsockname()[1])
+    con.connect()
+    con.send_output_setup(STATE, STATE_TYPES)
+    setp = con.send_input_setup(SETP, SETP_TYPES)
+    watchdog = con.send_input_setup(WATCHDOG, WATCHDOG_TYPES)
+    for name in SETP:
+        setattr(setp, name, 0.0)
+    watchdog.input_int_register_0 = 0
+    con.send_start()
+
+    def send_inputs():
+        if send_many:
+            con.send_many((setp, watchdog))
+        else:
+            con.send(setp)
+            con.send(watchdog)
+
+    for _ in range(warmup):
+        con.receive()
+        send_inputs()
+
+    counts = {}
+    sock = con._RTDE__sock
+    con._RTDE__sock = CountingSocket(sock, counts)
+    restore = [count_calls(select, "select", counts, "select")]
+    if selectors is not None:
+        restore.append(
+            count_calls(selectors.DefaultSelector, "select", counts, "epoll_wait")
+        )
+
+    latencies = []
+    try:
+        for _ in range(cycles):
+            start = time.perf_counter()
+            con.receive()
+            send_inputs()
+            latencies.append(time.perf_counter() - start)
+    finally:
+        for undo in restore:
+            undo()
+        con._RTDE__sock = sock
+
+    con.send_pause()
+    con.disconnect()
+    listener.close()
+    return {
+        "cycles": cycles,
+        "send_many": send_many,
+        "syscalls_per_cycle": float(sum(counts.values())) / cycles,
+        "calls_per_cycle": dict((k, float(v) / cycles) for k, v in counts.items()),
+        "cycle_latency_us": percentiles(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cycles", type=int, default=20000, help="cycles to run")
+    parser.add_argument("--warmup", type=int, default=1000, help="cycles not measured")
+    parser.add_argument(
+        "--send-many", help="send both recipes in one call", action="store_true"
+    )
+    parser.add_argument("--json", help="print results as JSON", action="store_true")
+    args = parser.parse_args()
+    report("syscalls", run(args.cycles, args.warmup, args.send_many), args.json)
+
+
+if __name__ == "__main__":
+    main()
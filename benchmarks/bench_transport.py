@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Receive throughput and pacing over loopback against rtde.simulator.
+
+The simulator runs in a separate process so it does not compete with the
+client for the interpreter lock. Sending as fast as possible, the rate at
+which the client drains packages is the highest output frequency it can
+sustain; at 500 Hz, receive() is measured for skipped packages and the
+latency from the simulator sending a package to the client decoding it.
+
+    python bench_transport.py [--duration 3] [--json]
+"""
+
+import argparse
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from common import ROOT, load_recipe, percentiles, report
+import rtde.rtde as rtde
+
+
+def free_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class Simulator(object):
+    """rtde.simulator in a child process"""
+
+    def __init__(self, frequency=None, host_timestamps=False):
+        self.port = free_port()
+        args = [sys.executable, "-m", "rtde.simulator", "--port", str(self.port)]
+        if frequency is not None:
+            args += ["--frequency", str(frequency)]
+        if host_timestamps:
+            args.append("--host-timestamps")
+        with open(os.devnull, "w") as devnull:
+            self.process = subprocess.Popen(args, cwd=ROOT, stderr=devnull)
+
+    def connect(self, names, types, frequency=500):
+        con = rtde.RTDE("127.0.0.1", self.port)
+        for _ in range(100):
+            try:
+                con.connect()
+                break
+            except socket.error:
+                time.sleep(0.05)
+        con.send_output_setup(names, types, frequency)
+        con.send_start()
+        return con
+
+    def close(self, con):
+        con.send_pause()
+        con.disconnect()
+        self.process.terminate()
+        self.process.wait()
+
+
+def drain_rate(names, types, duration, batch):
+    simulator = Simulator(frequency=0)
+    con = simulator.connect(names, types)
+    received = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        if batch:
+            received += len(con.receive_batch())
+        elif con.receive_buffered() is not None:
+            received += 1
+    elapsed = time.perf_counter() - start
+    simulator.close(con)
+    return received / elapsed
+
+
+def paced_receive(names, types, duration, frequency):
+    # the simulator sends its time.monotonic() as timestamp, the same clock
+    # in both processes
+    simulator = Simulator(host_timestamps=True)
+    con = simulator.connect(names, types, frequency)
+    latencies = []
+    while len(latencies) < duration * frequency:
+        state = con.receive()
+        latencies.append(time.monotonic() - state.timestamp)
+    skipped = con.skipped_package_count
+    simulator.close(con)
+    return {
+        "packages": len(latencies),
+        "skipped": skipped,
+        "latency_us": percentiles(latencies),
+    }
+
+
+def run(duration=3.0):
+    names, types = load_recipe("record_configuration.xml", "out")
+    results = {
+        "receive_buffered_max_hz": drain_rate(names, types, duration, batch=False),
+        "receive_500hz": paced_receive(names, types, duration, 500),
+    }
+    if importlib.util.find_spec("numpy") is None:
+        return results
+    results["receive_batch_max_hz"] = drain_rate(names, types, duration, batch=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per run")
+    parser.add_argument("--json", help="print results as JSON", action="store_true")
+    args = parser.parse_args()
+    report("transport", run(args.duration), args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Helpers shared by the benchmark scripts."""
+
+import json
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import rtde.rtde_config as rtde_config
+
+
+def load_recipe(filename, key):
+    """Names and types of a recipe in one of the example configuration files"""
+    conf = rtde_config.ConfigFile(os.path.join(ROOT, "examples", filename))
+    return conf.get_recipe(key)
+
+
+def percentiles(samples, scale=1e6):
+    """Summary of latency samples in seconds, scaled to microseconds"""
+    samples = sorted(samples)
+    result = {"mean": sum(samples) / len(samples) * scale, "max": samples[-1] * scale}
+    for q in (50, 90, 99, 99.9):
+        index = min(len(samples) - 1, int(len(samples) * q / 100.0))
+        result["p" + str(q)] = samples[index] * scale
+    return result
+
+
+def report(name, results, json_output=False):
+    if json_output:
+        json.dump({name: results}, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+        return
+    print(name)
+    _print_dict(results, "  ")
+
+
+def _print_dict(results, indent):
+    for key in sorted(results):
+        value = results[key]
+        if isinstance(value, dict):
+            print(indent + key)
+            _print_dict(value, indent + "  ")
+        elif isinstance(value, float):
+            print("%s%-28s %.2f" % (indent, key, value))
+        else:
+            print("%s%-28s %s" % (indent, key, value))
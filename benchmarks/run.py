@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Runs all benchmarks and writes the results as JSON.
+
+    python run.py --output results.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+from common import report
+import bench_serialize
+import bench_syscalls
+import bench_transport
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", help="JSON file to write, default stdout")
+    parser.add_argument("--quick", help="shorter runs", action="store_true")
+    args = parser.parse_args()
+
+    scale = 0.1 if args.quick else 1.0
+    results = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "serialize": bench_serialize.run(int(20000 * scale)),
+        "syscalls": bench_syscalls.run(int(20000 * scale), int(1000 * scale)),
+        "syscalls_send_many": bench_syscalls.run(
+            int(20000 * scale), int(1000 * scale), send_many=True
+        ),
+        "transport": bench_transport.run(3.0 * scale),
+    }
+    if args.output is None:
+        report("benchmarks", results, json_output=True)
+        return
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -29,16 +29,16 @@ import logging
 
 import rtde.rtde as rtde
 import rtde.rtde_config as rtde_config
+import rtde.control_loop as control_loop
 
 
 # logging.basicConfig(level=logging.INFO)
 
 ROBOT_HOST = "localhost"
 ROBOT_PORT = 30004
+FREQUENCY = 125
 config_filename = "control_loop_configuration.xml"
 
-keep_running = True
-
 logging.getLogger().setLevel(logging.INFO)
 
 conf = rtde_config.ConfigFile(config_filename)
@@ -53,7 +53,7 @@ con.connect()
 con.get_controller_version()
 
 # setup recipes
-con.send_output_setup(state_names, state_types)
+con.send_output_setup(state_names, state_types, FREQUENCY)
 setp = con.send_input_setup(setp_names, setp_types)
 watchdog = con.send_input_setup(watchdog_names, watchdog_types)
 
@@ -71,6 +71,10 @@ setp.input_double_register_5 = 0
 # The function "rtde_set_watchdog" in the "rtde_control_loop.urp" creates a 1 Hz watchdog
 watchdog.input_int_register_0 = 0
 
+# only send recipes when they change, the watchdog at least every 0.1 s
+con.set_send_on_change(setp)
+con.set_send_on_change(watchdog, keep_alive=0.1)
+
 
 def setp_to_list(sp):
     sp_list = []
@@ -89,15 +93,13 @@ def list_to_setp(sp, list):
 if not con.send_start():
     sys.exit()
 
-# control loop
+# control loop, one cycle per received state
 move_completed = True
-while keep_running:
-    # receive the current state
-    state = con.receive()
 
-    if state is None:
-        break
 
+def control(state):
+    global move_completed
+    inputs = []
     # do something...
     if move_completed and state.output_int_register_0 == 1:
         move_completed = False
@@ -105,7 +107,7 @@ while keep_running:
         list_to_setp(setp, new_setp)
         print("New pose = " + str(new_setp))
         # send new setpoint
-        con.send(setp)
+        inputs.append(setp)
         watchdog.input_int_register_0 = 1
     elif not move_completed and state.output_int_register_0 == 0:
         print("Move to confirmed pose = " + str(state.target_q))
@@ -113,7 +115,16 @@ while keep_running:
         watchdog.input_int_register_0 = 0
 
     # kick watchdog
-    con.send(watchdog)
+    inputs.append(watchdog)
+    return inputs
+
+
+loop = control_loop.ControlLoop(con, control, FREQUENCY)
+try:
+    loop.run()
+except KeyboardInterrupt:
+    pass
+logging.info("Control loop statistics: " + str(loop.get_stats()))
 
 con.send_pause()
 
@@ -33,6 +33,40 @@ sys.path.append("..")
 import rtde.csv_reader as csv_reader
 
 
+JOINT_VECTORS = {
+    "q": ["target_q", "actual_q"],
+    "qd": ["target_qd", "actual_qd"],
+    "qdd": ["target_qdd"],
+    "i": ["target_current", "actual_current", "actual_current_window"],
+    "x": ["target_TCP_pose", "actual_TCP_pose"],
+    "xd": ["target_TCP_speed", "actual_TCP_speed"],
+}
+JOINT_PLOT = [
+    "target_q",
+    "actual_q",
+    "target_qd",
+    "actual_qd",
+    "target_qdd",
+    "target_current",
+    "actual_current",
+    "actual_current_window",
+    "joint_mode",
+    "joint_control_output",
+]
+
+
+def get_plot_columns(plot_types):
+    """csv columns used by the given plot types"""
+    columns = ["robot_mode", "safety_mode"]
+    for plot_type in plot_types:
+        if plot_type.isdigit():
+            columns += [name + "_" + plot_type for name in JOINT_PLOT]
+        else:
+            for name in JOINT_VECTORS.get(plot_type, []):
+                columns += [name + "_" + str(i) for i in range(6)]
+    return columns
+
+
 class Plotter(object):
     # load data
     plot_samples = None
@@ -109,7 +143,7 @@ class Plotter(object):
         plot_name = name
         cnt = 0
         for p in self.plot_data:
-            y = p.__dict__[name]
+            y = getattr(p, name)
             if len(self.plot_data) > 1:
                 plot_name = name + " " + p.get_name()
             plot_color = self.get_plot_color(style, cnt)
@@ -161,12 +195,12 @@ class Plotter(object):
                 self.addYtext(subplots, naming)
                 for i in range(6):
                     name = "target_current_" + str(i)
-                    target_current = self.plot_data[0].__dict__[name]
+                    target_current = getattr(self.plot_data[0], name)
                     self.makesubplot(subplots[i], name, "rx-")
                     name = "actual_current_" + str(i)
                     self.makesubplot(subplots[i], name, "b+-")
                     name = "actual_current_window_" + str(i)
-                    current_window = self.plot_data[0].__dict__[name]
+                    current_window = getattr(self.plot_data[0], name)
                     self.makesubplot_withdata(
                         subplots[i],
                         target_current + current_window,
@@ -266,12 +300,12 @@ class Plotter(object):
                 name = "target_qdd_" + str(idx)
                 self.makesubplot(subplots[2], name, "rx-", 40)
                 name = "target_current_" + str(idx)
-                target_current = self.plot_data[0].__dict__[name]
+                target_current = getattr(self.plot_data[0], name)
                 self.makesubplot(subplots[3], name, "rx-")
                 name = "actual_current_" + str(idx)
                 self.makesubplot(subplots[3], name, "b+-")
                 name = "actual_current_window_" + str(idx)
-                current_window = self.plot_data[0].__dict__[name]
+                current_window = getattr(self.plot_data[0], name)
                 self.makesubplot_withdata(
                     subplots[3], target_current + current_window, "current max", "--"
                 )
@@ -303,9 +337,17 @@ class Plotter(object):
         return (plot_samples, plot_data)
 
     def get_plot_data(self, args):
+        columns = get_plot_columns(args.type)
         for file in args.file:
             with open(file) as csvfile:
-                data = csv_reader.CSVReader(csvfile, filter_running_program=args.filter)
+                # only parse the plotted columns, missing ones fail when plotted
+                header = csvfile.readline().split()
+                csvfile.seek(0)
+                data = csv_reader.CSVReader(
+                    csvfile,
+                    filter_running_program=args.filter,
+                    usecols=[name for name in columns if name in header],
+                )
                 self.plot_samples, self.plot_data = self.fill_plot_data(
                     data, self.plot_samples, self.plot_data
                 )
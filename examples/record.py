@@ -25,12 +25,19 @@
 import argparse
 import logging
 import sys
+import time
 
 sys.path.append("..")
 import rtde.rtde as rtde
 import rtde.rtde_config as rtde_config
 import rtde.csv_writer as csv_writer
 import rtde.csv_binary_writer as csv_binary_writer
+import rtde.record_file as record_file
+import rtde.recorder as recorder
+import rtde.rotating_writer as rotating_writer
+import rtde.parquet_writer as parquet_writer
+import rtde.hdf5_writer as hdf5_writer
+import rtde.time_index as time_index
 
 # parameters
 parser = argparse.ArgumentParser()
@@ -63,7 +70,62 @@ parser.add_argument(
 parser.add_argument(
     "--binary", help="save the data in binary format", action="store_true"
 )
+parser.add_argument(
+    "--columnar",
+    help="save the data in the memory-mappable recording format (rtde/record_file.py)",
+    action="store_true",
+)
+parser.add_argument(
+    "--parquet", help="save the data as a Parquet file (requires pyarrow)", action="store_true"
+)
+parser.add_argument(
+    "--hdf5",
+    help="save the data as HDF5 datasets readable while recording (requires h5py)",
+    action="store_true",
+)
+parser.add_argument(
+    "--index",
+    help="index the csv output by timestamp when done, see rtde/time_index.py",
+    action="store_true",
+)
+parser.add_argument(
+    "--async-writer",
+    help="write to the output file on a separate thread, in batches, "
+    "without skipping packages",
+    action="store_true",
+)
+parser.add_argument(
+    "--flush-interval",
+    type=float,
+    default=recorder.DEFAULT_FLUSH_INTERVAL,
+    help="seconds between writes with --async-writer (%(default)s)",
+)
+parser.add_argument(
+    "--rotate-mb",
+    type=float,
+    help="split the csv or --columnar output into compressed segments of this size, "
+    "with an index file",
+)
+parser.add_argument(
+    "--rotate-seconds",
+    type=float,
+    help="split the output into compressed segments of this duration",
+)
+parser.add_argument(
+    "--check-timestamps",
+    help="report missing cycles and the controller clock offset and drift",
+    action="store_true",
+)
+parser.add_argument(
+    "--float-format",
+    help='format of doubles in csv output, e.g. "%%.9g", faster than exact values',
+)
 args = parser.parse_args()
+if (args.binary or args.columnar) and (args.parquet or args.hdf5):
+    parser.error("--parquet and --hdf5 write decoded data, not --binary or --columnar")
+rotate = args.rotate_mb is not None or args.rotate_seconds is not None
+if rotate and (args.binary or args.parquet or args.hdf5):
+    parser.error("--rotate-mb and --rotate-seconds write csv or --columnar segments")
 
 if args.verbose:
     logging.basicConfig(level=logging.INFO)
@@ -82,24 +144,89 @@ if not con.send_output_setup(output_names, output_types, frequency=args.frequenc
     logging.error("Unable to configure output")
     sys.exit()
 
+monitor = con.enable_timestamp_monitor() if args.check_timestamps else None
+
 # start data synchronization
 if not con.send_start():
     logging.error("Unable to start synchronization")
     sys.exit()
 
-writeModes = "wb" if args.binary else "w"
-with open(args.output, writeModes) as csvfile:
+binary = args.binary or args.columnar
+writeModes = "wb" if binary else "w"
+if rotate:
+    output = rotating_writer.RotatingWriter(
+        args.output,
+        output_names,
+        output_types,
+        max_bytes=int((args.rotate_mb or 1e6) * 1024 * 1024),
+        max_seconds=args.rotate_seconds,
+        binary=binary,
+        float_format=args.float_format,
+    )
+elif args.parquet:
+    output = parquet_writer.ParquetWriter(args.output, output_names, output_types)
+elif args.hdf5:
+    output = hdf5_writer.HDF5Writer(args.output, output_names, output_types)
+else:
+    output = open(args.output, writeModes)
+with output as csvfile:
     writer = None
 
-    if args.binary:
+    if rotate or args.parquet or args.hdf5:
+        writer = csvfile
+    elif args.columnar:
+        writer = record_file.RecordWriter(
+            csvfile, output_names, output_types, {"frequency": args.frequency}
+        )
+    elif args.binary:
         writer = csv_binary_writer.CSVBinaryWriter(csvfile, output_names, output_types)
     else:
-        writer = csv_writer.CSVWriter(csvfile, output_names, output_types)
+        writer = csv_writer.CSVWriter(
+            csvfile, output_names, output_types, float_format=args.float_format
+        )
 
     writer.writeheader()
 
+    if args.async_writer:
+        rec = recorder.Recorder(
+            con,
+            writer,
+            None if args.parquet else csvfile,
+            flush_interval=args.flush_interval,
+            binary=binary,
+            # the writer thread keeps up with every package, none are skipped
+            buffered=True,
+            samples=args.samples,
+        )
+        rec.start()
+        try:
+            while rec.is_running():
+                time.sleep(1)
+                stats = rec.get_stats()
+                sys.stdout.write("\r")
+                if args.samples > 0:
+                    sys.stdout.write(
+                        "{:.2%} done.".format(
+                            float(stats["received"]) / float(args.samples)
+                        )
+                    )
+                else:
+                    sys.stdout.write("{:3d} samples.".format(stats["received"]))
+                sys.stdout.write(
+                    " queue {queued}/{queue_size}, dropped {dropped}".format(**stats)
+                )
+                sys.stdout.flush()
+        except KeyboardInterrupt:
+            pass
+        rec.stop()
+        if rec.error is not None:
+            logging.error("Recording failed: " + str(rec.error))
+            con.disconnect()
+            sys.exit(1)
+        logging.info("Recording statistics: " + str(rec.get_stats()))
+
     i = 1
-    keep_running = True
+    keep_running = not args.async_writer
     while keep_running:
 
         if i % args.frequency == 0:
@@ -115,9 +242,9 @@ with open(args.output, writeModes) as csvfile:
             keep_running = False
         try:
             if args.buffered:
-                state = con.receive_buffered(args.binary)
+                state = con.receive_buffered(binary)
             else:
-                state = con.receive(args.binary)
+                state = con.receive(binary)
             if state is not None:
                 writer.writerow(state)
                 i += 1
@@ -133,3 +260,13 @@ sys.stdout.write("\rComplete!            \n")
 
 con.send_pause()
 con.disconnect()
+
+if monitor is not None:
+    sys.stdout.write(
+        "missed cycles {missed_cycles} in {gaps} gaps, clock offset {offset:.6f} s, "
+        "drift {drift_ppm:.1f} ppm\n".format(**monitor.get_stats())
+    )
+
+# binary formats are searched without an index
+if args.index and not (binary or rotate or args.parquet or args.hdf5):
+    time_index.build_index(args.output)
@@ -0,0 +1,414 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import logging
+import socket
+import struct
+from collections import deque
+
+from . import serialize
+from .rtde import (
+    Command,
+    ConnectionState,
+    RTDEException,
+    DEFAULT_TIMEOUT,
+    DEFAULT_HISTORY_SIZE,
+    LOGNAME,
+    RTDE_PROTOCOL_VERSION_1,
+    RTDE_PROTOCOL_VERSION_2,
+)
+
+_log = logging.getLogger(LOGNAME)
+
+
+class AsyncRTDE(object):
+    """asyncio counterpart of rtde.RTDE.
+    A reader task started by connect() frames every package from the
+    stream: replies complete the pending request, data packages are queued
+    for receive(), receive_buffered() and stream(). Up to history_size
+    packages are queued, older ones are dropped and counted.
+    """
+
+    def __init__(self, hostname, port=30004, history_size=DEFAULT_HISTORY_SIZE):
+        self.hostname = hostname
+        self.port = port
+        self.__conn_state = ConnectionState.DISCONNECTED
+        self.__reader = None
+        self.__writer = None
+        self.__reader_task = None
+        self.__output_config = None
+        self.__input_config = {}
+        self.__pending = {}
+        self.__states = deque(maxlen=history_size)
+        self.__state_event = None
+        self.__data_listener = None
+        self.__skipped_package_count = 0
+        self.__dropped_package_count = 0
+        self.__protocolVersion = RTDE_PROTOCOL_VERSION_1
+
+    async def connect(self):
+        if self.__writer:
+            return
+
+        self.__reader, self.__writer = await asyncio.wait_for(
+            asyncio.open_connection(self.hostname, self.port), DEFAULT_TIMEOUT
+        )
+        sock = self.__writer.get_extra_info("socket")
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.__conn_state = ConnectionState.CONNECTED
+        self.__states.clear()
+        self.__state_event = asyncio.Event()
+        self.__skipped_package_count = 0
+        self.__dropped_package_count = 0
+        self.__reader_task = asyncio.ensure_future(self.__read_loop())
+        try:
+            if not await self.negotiate_protocol_version():
+                raise RTDEException("Unable to negotiate protocol version")
+        except BaseException:
+            await self.disconnect()
+            raise
+
+    async def disconnect(self):
+        if self.__writer:
+            writer = self.__writer
+            self.__writer = None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        if self.__reader_task:
+            self.__reader_task.cancel()
+            try:
+                await self.__reader_task
+            except asyncio.CancelledError:
+                pass
+            self.__reader_task = None
+        self.__conn_state = ConnectionState.DISCONNECTED
+
+    def is_connected(self):
+        return self.__conn_state is not ConnectionState.DISCONNECTED
+
+    async def get_controller_version(self):
+        cmd = Command.RTDE_GET_URCONTROL_VERSION
+        version = await self.__sendAndReceive(cmd)
+        if version:
+            _log.info(
+                "Controller version: %d.%d.%d.%d",
+                version.major,
+                version.minor,
+                version.bugfix,
+                version.build,
+            )
+            if version.major == 3 and version.minor <= 2 and version.bugfix < 19171:
+                raise RTDEException(
+                    "Please upgrade your controller to minimally version 3.2.19171"
+                )
+            return version.major, version.minor, version.bugfix, version.build
+        return None, None, None, None
+
+    async def negotiate_protocol_version(self):
+        cmd = Command.RTDE_REQUEST_PROTOCOL_VERSION
+        payload = struct.pack(">H", RTDE_PROTOCOL_VERSION_2)
+        success = await self.__sendAndReceive(cmd, payload)
+        if success:
+            self.__protocolVersion = RTDE_PROTOCOL_VERSION_2
+        return success
+
+    async def send_input_setup(self, variables, types=[]):
+        cmd = Command.RTDE_CONTROL_PACKAGE_SETUP_INPUTS
+        payload = bytearray(",".join(variables), "utf-8")
+        result = await self.__sendAndReceive(cmd, payload)
+        if result is None:
+            return None
+        if len(types) != 0 and list(result.types) != list(types):
+            _log.error(
+                "Data type inconsistency for input setup: "
+                + str(types)
+                + " - "
+                + str(result.types)
+            )
+            return None
+        result.names = variables
+        self.__input_config[result.id] = result
+        return serialize.DataObject.create_empty(variables, result.id)
+
+    async def send_output_setup(self, variables, types=[], frequency=125):
+        cmd = Command.RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS
+        payload = struct.pack(">d", frequency)
+        payload = payload + (",".join(variables).encode("utf-8"))
+        result = await self.__sendAndReceive(cmd, payload)
+        if result is None:
+            return False
+        if len(types) != 0 and list(result.types) != list(types):
+            _log.error(
+                "Data type inconsistency for output setup: "
+                + str(types)
+                + " - "
+                + str(result.types)
+            )
+            return False
+        result.names = variables
+        result.record = serialize.DataObject.create_record_class(
+            variables, result.layout, result.id
+        )
+        self.__output_config = result
+        return True
+
+    async def send_start(self):
+        cmd = Command.RTDE_CONTROL_PACKAGE_START
+        success = await self.__sendAndReceive(cmd)
+        if success:
+            _log.info("RTDE synchronization started")
+            self.__conn_state = ConnectionState.STARTED
+        else:
+            _log.error("RTDE synchronization failed to start")
+        return success
+
+    async def send_pause(self):
+        cmd = Command.RTDE_CONTROL_PACKAGE_PAUSE
+        success = await self.__sendAndReceive(cmd)
+        if success:
+            _log.info("RTDE synchronization paused")
+            self.__conn_state = ConnectionState.PAUSED
+        else:
+            _log.error("RTDE synchronization failed to pause")
+        return success
+
+    async def send(self, input_data):
+        if self.__conn_state != ConnectionState.STARTED:
+            _log.error("Cannot send when RTDE synchronization is inactive")
+            return
+        if not input_data.recipe_id in self.__input_config:
+            _log.error("Input configuration id not found: " + str(input_data.recipe_id))
+            return
+        config = self.__input_config[input_data.recipe_id]
+        return await self.__sendall(Command.RTDE_DATA_PACKAGE, config.pack(input_data))
+
+    async def send_message(
+        self, message, source="Python Client", type=serialize.Message.INFO_MESSAGE
+    ):
+        cmd = Command.RTDE_TEXT_MESSAGE
+        # bytes as for RTDE.send_message, text is encoded
+        if not isinstance(message, bytes):
+            message = message.encode("utf-8")
+        if not isinstance(source, bytes):
+            source = source.encode("utf-8")
+        fmt = ">B%dsB%dsB" % (len(message), len(source))
+        payload = struct.pack(fmt, len(message), message, len(source), source, type)
+        return await self.__sendall(cmd, payload)
+
+    def set_data_listener(self, callback):
+        """Hand every data package to callback(state) from the reader task
+        instead of queueing it for receive() and stream(). None restores
+        queueing.
+        """
+        self.__data_listener = callback
+
+    async def receive(self):
+        """Recieve the latest data package.
+        Older queued packages are discarded and counted as skipped. Waits
+        until a package is received, returns None after DEFAULT_TIMEOUT.
+        """
+        self.__check_receive()
+        if not self.__states and not await self.__wait_for_state():
+            return None
+        self.__skipped_package_count += len(self.__states) - 1
+        state = self.__states.pop()
+        self.__states.clear()
+        return state
+
+    def receive_buffered(self):
+        """Recieve the next queued data package, or None if none is queued."""
+        self.__check_receive()
+        if self.__states:
+            return self.__states.popleft()
+        if not self.is_connected():
+            raise RTDEException(" _recv() Connection lost ")
+        return None
+
+    async def stream(self):
+        """Yield every data package in the order it was received.
+
+        async for state in client.stream():
+            ...
+        """
+        self.__check_receive()
+        while True:
+            while self.__states:
+                yield self.__states.popleft()
+            await self.__wait_for_state()
+
+    def __check_receive(self):
+        if self.__output_config is None:
+            raise RTDEException("Output configuration not initialized")
+        if not self.__states and self.__conn_state != ConnectionState.STARTED:
+            raise RTDEException("Cannot receive when RTDE synchronization is inactive")
+
+    async def __wait_for_state(self):
+        while not self.__states:
+            if not self.is_connected():
+                raise RTDEException(" _recv() Connection lost ")
+            self.__state_event.clear()
+            try:
+                await asyncio.wait_for(self.__state_event.wait(), DEFAULT_TIMEOUT)
+            except asyncio.TimeoutError:
+                _log.warning("no data received in last %d seconds ", DEFAULT_TIMEOUT)
+                return False
+        return True
+
+    async def __sendAndReceive(self, cmd, payload=b""):
+        future = asyncio.get_running_loop().create_future()
+        self.__pending[cmd] = future
+        try:
+            if not await self.__sendall(cmd, payload):
+                return None
+            return await asyncio.wait_for(future, DEFAULT_TIMEOUT)
+        except asyncio.TimeoutError:
+            _log.warning("no reply received for command %d", cmd)
+            return None
+        finally:
+            if self.__pending.get(cmd) is future:
+                del self.__pending[cmd]
+
+    async def __sendall(self, command, payload=b""):
+        if self.__writer is None:
+            _log.error("Unable to send: not connected to Robot")
+            return False
+        self.__writer.write(struct.pack(">HB", 3 + len(payload), command) + payload)
+        await self.__writer.drain()
+        return True
+
+    async def __read_loop(self):
+        error = RTDEException(" _recv() Connection lost ")
+        try:
+            while True:
+                header = serialize.ControlHeader.unpack(
+                    await self.__reader.readexactly(3)
+                )
+                payload = await self.__reader.readexactly(header.size - 3)
+                self.__on_packet(header.command, payload)
+        except asyncio.IncompleteReadError:
+            _log.error(
+                "received 0 bytes from Controller, probable cause: Controller has stopped"
+            )
+        except (ConnectionError, OSError) as e:
+            _log.error("RTDE connection lost: " + str(e))
+            error = e
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _log.error("RTDE reader stopped: " + repr(e))
+            error = e
+        finally:
+            _log.info("RTDE disconnected")
+            self.__conn_state = ConnectionState.DISCONNECTED
+            if self.__writer:
+                self.__writer.close()
+                self.__writer = None
+            for future in self.__pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.__state_event.set()
+
+    def __on_packet(self, cmd, payload):
+        if cmd == Command.RTDE_DATA_PACKAGE:
+            if self.__output_config is None:
+                _log.error("RTDE_DATA_PACKAGE: Missing output configuration")
+                return
+            state = self.__output_config.unpack(payload)
+            if self.__data_listener is not None:
+                self.__data_listener(state)
+                return
+            if len(self.__states) == self.__states.maxlen:
+                self.__dropped_package_count += 1
+            self.__states.append(state)
+            self.__state_event.set()
+        elif cmd == Command.RTDE_TEXT_MESSAGE:
+            self.__log_text_message(payload)
+        else:
+            future = self.__pending.get(cmd)
+            if future is None or future.done():
+                _log.debug("skipping package(2)")
+                return
+            try:
+                future.set_result(self.__unpack_reply(cmd, payload))
+            except Exception as e:
+                # e.g. a recipe with unknown types, the stream is still framed
+                future.set_exception(e)
+
+    def __unpack_reply(self, cmd, payload):
+        if cmd == Command.RTDE_GET_URCONTROL_VERSION:
+            if len(payload) != 16:
+                _log.error("RTDE_GET_URCONTROL_VERSION: Wrong payload size")
+                return None
+            return serialize.ControlVersion.unpack(payload)
+        elif cmd in (
+            Command.RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS,
+            Command.RTDE_CONTROL_PACKAGE_SETUP_INPUTS,
+        ):
+            if len(payload) < 1:
+                _log.error("RTDE_CONTROL_PACKAGE_SETUP: No payload")
+                return None
+            return serialize.DataConfig.unpack_recipe(payload)
+        elif cmd in (
+            Command.RTDE_REQUEST_PROTOCOL_VERSION,
+            Command.RTDE_CONTROL_PACKAGE_START,
+            Command.RTDE_CONTROL_PACKAGE_PAUSE,
+        ):
+            if len(payload) != 1:
+                _log.error("Wrong payload size for command " + str(cmd))
+                return None
+            return serialize.ReturnValue.unpack(payload).success
+        _log.error("Unknown package command: " + str(cmd))
+        return None
+
+    def __log_text_message(self, payload):
+        if len(payload) < 1:
+            _log.error("RTDE_TEXT_MESSAGE: No payload")
+            return
+        if self.__protocolVersion == RTDE_PROTOCOL_VERSION_1:
+            msg = serialize.MessageV1.unpack(payload)
+        else:
+            msg = serialize.Message.unpack(payload)
+
+        if (
+            msg.level == serialize.Message.EXCEPTION_MESSAGE
+            or msg.level == serialize.Message.ERROR_MESSAGE
+        ):
+            _log.error(msg.source + ": " + msg.message)
+        elif msg.level == serialize.Message.WARNING_MESSAGE:
+            _log.warning(msg.source + ": " + msg.message)
+        elif msg.level == serialize.Message.INFO_MESSAGE:
+            _log.info(msg.source + ": " + msg.message)
+
+    @property
+    def skipped_package_count(self):
+        """The skipped package count, resets on connect"""
+        return self.__skipped_package_count
+
+    @property
+    def dropped_package_count(self):
+        """Packages dropped from the full receive queue, resets on connect"""
+        return self.__dropped_package_count
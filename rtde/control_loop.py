@@ -0,0 +1,176 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import logging
+import threading
+import time
+
+from .rtde import LOGNAME
+from .stats import Histogram, clock
+
+_log = logging.getLogger(LOGNAME)
+
+# a cycle starts when a data package arrives
+PACKET_CLOCK = "packets"
+# a cycle starts at fixed absolute deadlines, using the latest package
+TIMER_CLOCK = "timer"
+
+
+class ControlLoop(object):
+    """Calls callback(state) once per control cycle and sends the input
+    data object, or list of objects, it returns in the same cycle with a
+    single RTDE.send_many() call.
+
+    With the default packet clock every data package starts a cycle, so the
+    loop runs at the output frequency without drifting. With the timer
+    clock cycles start at start + n / frequency, independently of package
+    arrival, and the callback receives the latest package from a receiver
+    thread. A cycle without a package newer than the previous cycle's is
+    skipped and counted as stale, unless stale_states is True, e.g. to run
+    faster than the output frequency. Cycles missed because a callback ran
+    too long are skipped and counted as overruns.
+
+    get_stats() reports the jitter of the cycle start against the period,
+    the time from the start of a cycle until its inputs are sent and how
+    far cycles that took longer than a period overran it.
+    """
+
+    def __init__(
+        self, con, callback, frequency=125, clock=PACKET_CLOCK, stale_states=False
+    ):
+        if clock not in (PACKET_CLOCK, TIMER_CLOCK):
+            raise ValueError("Unknown clock: " + str(clock))
+        self.__con = con
+        self.__callback = callback
+        self.__period = 1.0 / frequency
+        self.__clock = clock
+        self.__stale_states = stale_states
+        self.__stop = threading.Event()
+        self.__jitter = Histogram()
+        self.__turnaround = Histogram()
+        self.__overrun = Histogram()
+        self.__cycles = 0
+        self.__overruns = 0
+        self.__timeouts = 0
+        self.__stale = 0
+        self.__skipped = 0
+
+    def run(self, cycles=None):
+        """Run until stop() is called, cycles have completed or the
+        connection is lost. Returns the number of cycles run.
+        """
+        self.__stop.clear()
+        skipped = self.__con.skipped_package_count
+        try:
+            if self.__clock == PACKET_CLOCK:
+                self.__run_packets(cycles)
+            else:
+                self.__run_timer(cycles)
+        finally:
+            self.__skipped += self.__con.skipped_package_count - skipped
+        return self.__cycles
+
+    def stop(self):
+        """Stop the loop after the current cycle, from any thread."""
+        self.__stop.set()
+
+    def get_stats(self):
+        return {
+            "cycles": self.__cycles,
+            "overruns": self.__overruns,
+            "timeouts": self.__timeouts,
+            "stale": self.__stale,
+            "skipped": self.__skipped,
+            "period": self.__period,
+            "jitter": self.__jitter.to_dict(),
+            "turnaround": self.__turnaround.to_dict(),
+            "overrun": self.__overrun.to_dict(),
+        }
+
+    def __cycle(self, state, start):
+        inputs = self.__callback(state)
+        if inputs is not None:
+            if not isinstance(inputs, (list, tuple)):
+                inputs = (inputs,)
+            self.__con.send_many(inputs)
+        duration = clock() - start
+        self.__turnaround.record(duration)
+        if duration > self.__period:
+            self.__overrun.record(duration - self.__period)
+        self.__cycles += 1
+
+    def __run_packets(self, cycles):
+        con = self.__con
+        previous = None
+        while not self.__stop.is_set() and con.is_connected():
+            if cycles is not None and self.__cycles >= cycles:
+                break
+            skipped = con.skipped_package_count
+            state = con.receive()
+            start = clock()
+            if state is None:
+                self.__timeouts += 1
+                previous = None
+                continue
+            if previous is not None:
+                self.__jitter.record(abs(start - previous - self.__period))
+            if con.skipped_package_count != skipped:
+                # the previous cycle took longer than a period
+                self.__overruns += 1
+            previous = start
+            self.__cycle(state, start)
+
+    def __run_timer(self, cycles):
+        con = self.__con
+        started_receiver = not con.is_receiver_running()
+        if started_receiver:
+            con.start_receiver()
+        try:
+            previous = None
+            deadline = clock()
+            while not self.__stop.is_set() and con.is_connected():
+                if cycles is not None and self.__cycles >= cycles:
+                    break
+                # absolute deadlines, so sleep and callback time do not add up
+                delay = deadline - clock()
+                if delay > 0:
+                    time.sleep(delay)
+                start = clock()
+                self.__jitter.record(abs(start - deadline))
+                state = con.get_latest_state()
+                if state is None:
+                    self.__timeouts += 1
+                elif state is previous and not self.__stale_states:
+                    # the receiver published nothing since the last cycle
+                    self.__stale += 1
+                else:
+                    previous = state
+                    self.__cycle(state, start)
+                deadline += self.__period
+                missed = int((clock() - deadline) / self.__period)
+                if missed > 0:
+                    self.__overruns += missed
+                    deadline += missed * self.__period
+        finally:
+            if started_receiver:
+                con.stop_receiver()
@@ -0,0 +1,128 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import logging
+import os
+
+import numpy as np
+
+from . import serialize
+from .csv_reader import runtime_state, runtime_state_running
+from .rtde import LOGNAME
+
+_log = logging.getLogger(LOGNAME)
+
+
+def get_column_dtype(header, types):
+    """Record type of a CSVBinaryWriter file from its two header lines,
+    one big-endian field per column.
+    """
+    if len(header) != len(types):
+        raise ValueError("Header has %d names but %d types" % (len(header), len(types)))
+    for column_type in types:
+        # the writer splits vectors into one column per element
+        if column_type.startswith("VECTOR"):
+            raise ValueError("Unknown data type: " + column_type)
+    return serialize.get_dtype(header, types)
+
+
+class BinaryReader(object):
+    """Reads files written by CSVBinaryWriter (record.py --binary).
+    Every column is available as an attribute like with CSVReader, e.g.
+    target_q_0, as an array of the type it was recorded with. With
+    mmap=True the file is memory-mapped and columns are read from disk when
+    accessed. A record cut short at the end of the file is ignored.
+    """
+
+    __samples = None
+    __filename = None
+
+    def __init__(
+        self, binfile, delimiter=" ", filter_running_program=False, mmap=False
+    ):
+        self.__filename = binfile.name
+        header = binfile.readline().decode("utf-8").rstrip("\n").split(delimiter)
+        types = binfile.readline().decode("utf-8").rstrip("\n").split(delimiter)
+        self.__header = header
+        self.__dtype = get_column_dtype(header, types)
+        offset = binfile.tell()
+        count = (os.fstat(binfile.fileno()).st_size - offset) // self.__dtype.itemsize
+
+        if count == 0:
+            self.__data = np.empty(0, dtype=self.__dtype)
+        elif mmap:
+            self.__data = np.memmap(
+                self.__filename,
+                dtype=self.__dtype,
+                mode="r",
+                offset=offset,
+                shape=(count,),
+            )
+        else:
+            self.__data = np.fromfile(binfile, dtype=self.__dtype, count=count)
+
+        if len(self.__data) == 0:
+            _log.warn("No data read from file: " + self.__filename)
+
+        self.__mask = None
+        if filter_running_program:
+            if runtime_state not in header:
+                _log.warn(
+                    "Unable to filter data since runtime_state field is missing in data set"
+                )
+            else:
+                self.__mask = self.__data[runtime_state] == int(runtime_state_running)
+                if not mmap:
+                    self.__data = self.__data[self.__mask]
+                    self.__mask = None
+
+        self.__samples = len(self.__data)
+        if self.__mask is not None:
+            self.__samples = int(self.__mask.sum())
+
+        if self.__samples == 0 and filter_running_program:
+            _log.warn("No data left from file: " + self.__filename + " after filtering")
+
+    def __getattr__(self, name):
+        # only called for names that are not regular attributes
+        data = self.__dict__.get("_BinaryReader__data")
+        if data is None or name not in data.dtype.names:
+            raise AttributeError(name)
+        column = data[name]
+        if self.__mask is not None:
+            column = column[self.__mask]
+        return column
+
+    @property
+    def data(self):
+        """All records as a structured array, unfiltered in mmap mode"""
+        return self.__data
+
+    def get_header(self):
+        return self.__header
+
+    def get_samples(self):
+        return self.__samples
+
+    def get_name(self):
+        return self.__filename
@@ -121,73 +121,5 @@ class CSVBinaryWriter(object):
         typeStr += "\n"
         self.__file.write(struct.pack(str(len(typeStr)) + "s", typeStr if sys.version_info[0] < 3 else typeStr.encode("utf-8")))
 
-    def packToBinary(self, vtype, value):
-        print(vtype)
-        if vtype == "BOOL":
-            print("isBOOL" + str(value))
-        if vtype == "UINT8":
-            print("isUINT8" + str(value))
-        elif vtype == "INT32":
-            print("isINT32" + str(value))
-        elif vtype == "INT64":
-            print("isINT64" + str(value))
-        elif vtype == "UINT32":
-            print("isUINT32" + str(value))
-        elif vtype == "UINT64":
-            print("isUINT64" + str(value))
-        elif vtype == "DOUBLE":
-            print(
-                "isDOUBLE" + str(value) + str(type(value)) + str(sys.getsizeof(value))
-            )
-        elif vtype == "VECTOR3D":
-            print(
-                "isVECTOR3D" + str(value[0]) + "," + str(value[1]) + "," + str(value[2])
-            )
-        elif vtype == "VECTOR6D":
-            print(
-                "isVECTOR6D"
-                + str(value[0])
-                + ","
-                + str(value[1])
-                + ","
-                + str(value[2])
-                + ","
-                + str(value[3])
-                + ","
-                + str(value[4])
-                + ","
-                + str(value[5])
-            )
-        elif vtype == "VECTOR6INT32":
-            print(
-                "isVECTOR6INT32"
-                + str(value[0])
-                + ","
-                + str(value[1])
-                + ","
-                + str(value[2])
-                + ","
-                + str(value[3])
-                + ","
-                + str(value[4])
-                + ","
-                + str(value[5])
-            )
-        elif vtype == "VECTOR6UINT32":
-            print(
-                "isVECTOR6UINT32"
-                + str(value[0])
-                + ","
-                + str(value[1])
-                + ","
-                + str(value[2])
-                + ","
-                + str(value[3])
-                + ","
-                + str(value[4])
-                + ","
-                + str(value[5])
-            )
-
     def writerow(self, data_object):
         self.__file.write(data_object)
@@ -22,6 +22,7 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import csv
+import itertools
 import numpy as np
 import logging
 
@@ -33,8 +34,60 @@ _log = logging.getLogger(LOGNAME)
 runtime_state = "runtime_state"
 runtime_state_running = "2"
 
+DEFAULT_CHUNK_ROWS = 100000
+# small enough for the text of a block to stay well below the parsed arrays
+LOAD_CHUNK_ROWS = 10000
+
+
+def _read_header(csvfile, delimiter):
+    for line in csvfile:
+        if line.strip():
+            return next(csv.reader([line], delimiter=delimiter))
+    return []
+
+
+def _check_columns(header, names):
+    missing = [name for name in names if name not in header]
+    if missing:
+        raise ValueError("Columns not found in file: " + ", ".join(missing))
+
+
+def _parse_blocks(csvfile, header, names, rows, delimiter, filter_state):
+    """Yields (row count, dictionary of column arrays) per block of lines"""
+    indices = [header.index(name) for name in names]
+    state = None
+    if filter_state:
+        # parsed along with the selected columns, not necessarily one of them
+        state = len(indices)
+        indices.append(header.index(runtime_state))
+
+    running = float(runtime_state_running)
+    while True:
+        lines = list(itertools.islice(csvfile, rows))
+        if not lines:
+            break
+        lines = [line for line in lines if line.strip()]
+        if not lines:
+            continue
+        if not indices:
+            yield len(lines), {}
+            continue
+        block = np.loadtxt(
+            lines, delimiter=delimiter, usecols=indices, ndmin=2, dtype=float
+        )
+        if state is not None:
+            block = block[block[:, state] == running]
+        yield len(block), dict((name, block[:, i]) for i, name in enumerate(names))
+
 
 class CSVReader(object):
+    """Loads a csv file written by CSVWriter into one float array per column.
+    The file is parsed in chunks, so peak memory stays close to the size of
+    the resulting arrays. usecols restricts loading to the given column names,
+    with lazy=True no column is loaded up front. Other columns of the file
+    are parsed on first access, or together with materialize().
+    """
+
     __samples = None
     __filename = None
 
@@ -42,47 +95,134 @@ class CSVReader(object):
         header = next(__reader)
         return header
 
-    def __init__(self, csvfile, delimiter=" ", filter_running_program=False):
+    def __init__(
+        self,
+        csvfile,
+        delimiter=" ",
+        filter_running_program=False,
+        usecols=None,
+        lazy=False,
+    ):
         self.__filename = csvfile.name
-
-        csvfile = [
-            csvfile for csvfile in csvfile.readlines() if csvfile.strip()
-        ]  # remove any empty lines
-
-        reader = csv.reader(csvfile, delimiter=delimiter)
-        header = self.get_header_data(reader)
-
-        # read csv file
-        data = [row for row in reader]
-
-        if len(data) == 0:
+        self.__delimiter = delimiter
+        self.__mask = None
+        self.__header = _read_header(csvfile, delimiter)
+
+        if lazy:
+            names = []
+        elif usecols is None:
+            names = list(self.__header)
+        else:
+            _check_columns(self.__header, usecols)
+            names = list(usecols)
+
+        filter_state = False
+        if filter_running_program:
+            if runtime_state not in self.__header:
+                _log.warn(
+                    "Unable to filter data since runtime_state field is missing in data set"
+                )
+            else:
+                filter_state = True
+                if runtime_state not in names:
+                    names.append(runtime_state)
+
+        rows, columns = self.__load(csvfile, names)
+        self.__samples = rows
+        if filter_state:
+            self.__mask = columns[runtime_state] == float(runtime_state_running)
+            self.__samples = int(self.__mask.sum())
+        for name in list(columns):
+            self.__set_column(name, columns.pop(name))
+
+        if self.__samples == 0 and filter_state:
+            _log.warn("No data left from file: " + self.__filename + " after filtering")
+        elif self.__samples == 0:
             _log.warn("No data read from file: " + self.__filename)
 
-        # filter data
+    def __getattr__(self, name):
+        # only called for columns that are not loaded yet
+        header = self.__dict__.get("_CSVReader__header")
+        if header is None or name not in header:
+            raise AttributeError(name)
+        self.materialize([name])
+        return self.__dict__[name]
+
+    def materialize(self, names):
+        """Load the given columns in one pass over the file"""
+        _check_columns(self.__header, names)
+        missing = [
+            name
+            for i, name in enumerate(names)
+            if name not in self.__dict__ and name not in names[:i]
+        ]
+        if not missing:
+            return
+        with open(self.__filename) as csvfile:
+            _read_header(csvfile, self.__delimiter)
+            _, columns = self.__load(csvfile, missing)
+        for name in missing:
+            self.__set_column(name, columns.pop(name))
+
+    def __load(self, csvfile, names):
+        names = [name for i, name in enumerate(names) if name not in names[:i]]
+        columns = dict((name, []) for name in names)
+        rows = 0
+        for count, block in _parse_blocks(
+            csvfile, self.__header, names, LOAD_CHUNK_ROWS, self.__delimiter, False
+        ):
+            rows += count
+            # copies, so every parsed block is released right away
+            for name, array in block.items():
+                columns[name].append(array.copy())
+        for name in names:
+            arrays = columns.pop(name)
+            columns[name] = np.concatenate(arrays) if arrays else np.empty(0)
+        return rows, columns
+
+    def __set_column(self, name, array):
+        if self.__mask is not None:
+            array = array[self.__mask]
+        setattr(self, name, array)
+
+    @staticmethod
+    def iter_chunks(
+        csvfile,
+        rows=DEFAULT_CHUNK_ROWS,
+        delimiter=" ",
+        usecols=None,
+        filter_running_program=False,
+    ):
+        """Parse csvfile in blocks of up to rows lines.
+        Yields a dictionary from column name to float array per block, only
+        for the columns in usecols if given. With filter_running_program rows
+        are dropped where no program is running.
+        """
+        header = _read_header(csvfile, delimiter)
+        if usecols is None:
+            usecols = header
+        _check_columns(header, usecols)
+
+        filter_state = False
         if filter_running_program:
             if runtime_state not in header:
                 _log.warn(
                     "Unable to filter data since runtime_state field is missing in data set"
                 )
             else:
-                idx = header.index(runtime_state)
-                data = [row for row in data if row[idx] == runtime_state_running]
-
-        self.__samples = len(data)
-
-        if self.__samples == 0:
-            _log.warn("No data left from file: " + self.__filename + " after filtering")
-
-        # transpose data
-        data = list(zip(*data))
-
-        # create dictionary from  header elements (keys) to float arrays
-        self.__dict__.update(
-            {
-                header[i]: np.array(list(map(float, data[:][i])))
-                for i in range(len(header))
-            }
-        )
+                filter_state = True
+
+        empty = True
+        for _, block in _parse_blocks(
+            csvfile, header, list(usecols), rows, delimiter, filter_state
+        ):
+            empty = False
+            yield block
+        if empty:
+            yield dict((name, np.empty(0)) for name in usecols)
+
+    def get_header(self):
+        return self.__header
 
     def get_samples(self):
         return self.__samples
@@ -22,6 +22,7 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import csv
+import operator
 
 import sys
 
@@ -31,16 +32,29 @@ from rtde import serialize
 
 
 class CSVWriter(object):
-    def __init__(self, csvfile, names, types, delimiter=" "):
+    """Writes data objects as delimited text, one column per value.
+    Doubles are written in their shortest exact representation unless
+    float_format (e.g. "%.9g") is given, which is several times faster.
+    """
+
+    def __init__(self, csvfile, names, types, delimiter=" ", float_format=None):
         if len(names) != len(types):
             raise ValueError("List sizes are not identical.")
+        self.__file = csvfile
         self.__names = names
         self.__types = types
+        self.__delimiter = delimiter
         self.__header_names = []
         self.__columns = 0
+        # flattening plan: which variables are vectors, worked out once
+        self.__vectors = []
+        formats = []
         for i in range(len(self.__names)):
             size = serialize.get_item_size(self.__types[i])
             self.__columns += size
+            self.__vectors.append(size > 1)
+            is_double = self.__types[i] == "DOUBLE" or self.__types[i].endswith("D")
+            formats.extend([float_format if is_double else "%s"] * size)
             if size > 1:
                 for j in range(size):
                     name = self.__names[i] + "_" + str(j)
@@ -48,18 +62,62 @@ class CSVWriter(object):
             else:
                 name = self.__names[i]
                 self.__header_names.append(name)
+        self.__vectors = tuple(self.__vectors)
+        self.__getter = operator.attrgetter(*names)
+        if len(names) == 1:
+            getter = self.__getter
+            self.__getter = lambda data_object: (getter(data_object),)
         self.__writer = csv.writer(csvfile, delimiter=delimiter)
+        self.__lineterminator = self.__writer.dialect.lineterminator
+        self.__template = None
+        if float_format is not None:
+            self.__template = delimiter.join(formats) + self.__lineterminator
 
     def writeheader(self):
         self.__writer.writerow(self.__header_names)
 
     def writerow(self, data_object):
+        if self.__template is not None:
+            self.__file.write(self.__template % tuple(self.__flatten(data_object)))
+        else:
+            self.__writer.writerow(self.__flatten(data_object))
+
+    def writerows(self, data_objects):
+        if self.__template is not None:
+            template = self.__template
+            flatten = self.__flatten
+            self.__file.write("".join(template % tuple(flatten(o)) for o in data_objects))
+        else:
+            self.__writer.writerows(self.__flatten(o) for o in data_objects)
+
+    def write_block(self, block):
+        """Write a structured array, e.g. from RTDE.receive_batch(), one row
+        per record, formatted like writerow() would.
+        """
+        if len(block) == 0:
+            return
+        columns = []
+        for name, vector in zip(self.__names, self.__vectors):
+            field = block[name]
+            if vector:
+                columns.extend(field[:, i].tolist() for i in range(field.shape[1]))
+            else:
+                columns.append(field.tolist())
+        rows = zip(*columns)
+        if self.__template is not None:
+            template = self.__template
+            self.__file.write("".join([template % row for row in rows]))
+        else:
+            join = self.__delimiter.join
+            lineterminator = self.__lineterminator
+            lines = [join(map(str, row)) for row in rows]
+            self.__file.write(lineterminator.join(lines) + lineterminator)
+
+    def __flatten(self, data_object):
         data = []
-        for i in range(len(self.__names)):
-            size = serialize.get_item_size(self.__types[i])
-            value = data_object.__dict__[self.__names[i]]
-            if size > 1:
+        for value, vector in zip(self.__getter(data_object), self.__vectors):
+            if vector:
                 data.extend(value)
             else:
                 data.append(value)
-        self.__writer.writerow(data)
+        return data
@@ -0,0 +1,215 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import functools
+import logging
+from collections import OrderedDict, deque
+
+from .async_rtde import AsyncRTDE
+from .rtde import RTDEException, DEFAULT_TIMEOUT, DEFAULT_HISTORY_SIZE, LOGNAME
+from .timestamp_monitor import TimestampMonitor
+
+_log = logging.getLogger(LOGNAME)
+
+ALIGN_HISTORY = 64  # packages per robot kept for aligning stream()
+
+
+class RTDEFleet(object):
+    """Many RTDE connections served by one asyncio event loop.
+    hosts is a list of hostnames, or (hostname, port) tuples, which are
+    also the keys of every per-robot result. Setup commands run
+    concurrently on all connected robots, a robot that fails has its
+    exception as result. Robots that fail to connect are left out of
+    later commands. States are available merged in arrival order from
+    merged(), or aligned on controller timestamps from stream().
+    """
+
+    def __init__(self, hosts, port=30004, history_size=DEFAULT_HISTORY_SIZE):
+        self.__clients = OrderedDict()
+        for host in hosts:
+            if isinstance(host, tuple):
+                client = AsyncRTDE(host[0], host[1])
+            else:
+                client = AsyncRTDE(host, port)
+            client.set_data_listener(functools.partial(self.__on_state, host))
+            self.__clients[host] = client
+        self.__states = deque(maxlen=history_size)
+        self.__latest = OrderedDict((host, None) for host in self.__clients)
+        self.__state_event = None
+        self.__frequency = 125
+        self.__history = dict(
+            (host, deque(maxlen=ALIGN_HISTORY)) for host in self.__clients
+        )
+        self.__monitors = {}
+        self.__dropped_package_count = 0
+
+    @property
+    def clients(self):
+        """The AsyncRTDE connection of every host"""
+        return OrderedDict(self.__clients)
+
+    async def connect(self):
+        """Connect to every robot, returns the result or exception per host.
+        Robots that cannot be reached are disconnected and skipped.
+        """
+        self.__state_event = asyncio.Event()
+        self.__states.clear()
+        self.__dropped_package_count = 0
+        results = await self.__gather("connect", hosts=list(self.__clients))
+        for host, result in results.items():
+            if isinstance(result, BaseException):
+                _log.error("Unable to connect to %s: %r", host, result)
+                await self.__clients[host].disconnect()
+        return results
+
+    async def disconnect(self):
+        return await self.__gather("disconnect", hosts=list(self.__clients))
+
+    def is_connected(self):
+        return any(c.is_connected() for c in self.__clients.values())
+
+    async def get_controller_version(self):
+        return await self.__gather("get_controller_version")
+
+    async def send_input_setup(self, variables, types=[]):
+        return await self.__gather("send_input_setup", variables, types)
+
+    async def send_output_setup(self, variables, types=[], frequency=125):
+        self.__frequency = frequency
+        self.__monitors = {}
+        if "timestamp" in variables and frequency > 0:
+            self.__monitors = dict(
+                (host, TimestampMonitor(frequency)) for host in self.__clients
+            )
+        for history in self.__history.values():
+            history.clear()
+        return await self.__gather("send_output_setup", variables, types, frequency)
+
+    async def send_start(self):
+        return await self.__gather("send_start")
+
+    async def send_pause(self):
+        return await self.__gather("send_pause")
+
+    async def send(self, inputs):
+        """Send input_data to every host in the inputs dictionary"""
+        hosts = [h for h in self.__clients if h in inputs]
+        results = await asyncio.gather(
+            *[self.__clients[h].send(inputs[h]) for h in hosts],
+            return_exceptions=True
+        )
+        return OrderedDict(zip(hosts, results))
+
+    def get_latest_states(self):
+        """The newest state of every host, None until one is received"""
+        return OrderedDict(self.__latest)
+
+    async def merged(self):
+        """Yield (host, state) for every package of every robot in the order
+        they were received.
+        """
+        while True:
+            while self.__states:
+                yield self.__states.popleft()
+            if not self.is_connected():
+                raise RTDEException(" _recv() Connection lost ")
+            self.__state_event.clear()
+            try:
+                await asyncio.wait_for(self.__state_event.wait(), DEFAULT_TIMEOUT)
+            except asyncio.TimeoutError:
+                _log.warning("no data received in last %d seconds ", DEFAULT_TIMEOUT)
+
+    async def stream(self, period=None, lag=None):
+        """Yield (timestamp, states) once every period seconds, by default
+        the output frequency. timestamp is the event loop's monotonic time
+        lag seconds ago, by default one output period, and states maps every
+        host to its state sampled closest to it: controller timestamps are
+        mapped to the loop clock by a TimestampMonitor per robot. Without
+        timestamp in the recipe, or until the first package of a robot,
+        states hold the newest state instead. Ticks that are missed because
+        the consumer is late are skipped rather than bunched up.
+        """
+        loop = asyncio.get_running_loop()
+        if period is None:
+            period = 1.0 / self.__frequency
+        if lag is None:
+            lag = 1.0 / self.__frequency
+        deadline = loop.time() + period
+        while True:
+            delay = deadline - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if not self.is_connected():
+                raise RTDEException(" _recv() Connection lost ")
+            now = loop.time()
+            target = now - lag
+            states = OrderedDict(
+                (host, self.__aligned_state(host, target)) for host in self.__latest
+            )
+            yield target, states
+            deadline += period
+            if deadline < now:
+                deadline = now + period
+
+    def __aligned_state(self, host, target):
+        monitor = self.__monitors.get(host)
+        history = self.__history[host]
+        if monitor is None or not history:
+            return self.__latest[host]
+        best = None
+        best_distance = None
+        for state in reversed(history):
+            distance = abs(monitor.to_host_time(state.timestamp) - target)
+            if best_distance is not None and distance > best_distance:
+                break
+            best, best_distance = state, distance
+        return best
+
+    def __on_state(self, host, state):
+        self.__latest[host] = state
+        monitor = self.__monitors.get(host)
+        if monitor is not None:
+            monitor.update(state.timestamp, asyncio.get_running_loop().time())
+            self.__history[host].append(state)
+        if len(self.__states) == self.__states.maxlen:
+            self.__dropped_package_count += 1
+        self.__states.append((host, state))
+        self.__state_event.set()
+
+    async def __gather(self, method, *args, **kwargs):
+        # run the same AsyncRTDE call on every connected robot concurrently,
+        # a failing robot does not cancel the calls to the others
+        hosts = kwargs.get("hosts")
+        if hosts is None:
+            hosts = [h for h, c in self.__clients.items() if c.is_connected()]
+        results = await asyncio.gather(
+            *[getattr(self.__clients[h], method)(*args) for h in hosts],
+            return_exceptions=True
+        )
+        return OrderedDict(zip(hosts, results))
+
+    @property
+    def dropped_package_count(self):
+        """Packages dropped from the full merged queue, resets on connect"""
+        return self.__dropped_package_count
@@ -0,0 +1,169 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+
+try:
+    import h5py
+except ImportError:  # h5py is optional
+    h5py = None
+
+from rtde import serialize
+
+DEFAULT_CHUNK_ROWS = 4096
+
+
+def open_swmr(filename):
+    """Open a file that is still being recorded for reading.
+    Call refresh() on a dataset to see rows appended since.
+    """
+    if h5py is None:
+        raise ImportError("h5py is required for HDF5 files")
+    return h5py.File(filename, "r", libver="latest", swmr=True)
+
+
+class HDF5Writer(object):
+    """Writes every recipe variable to its own dataset, e.g. /actual_q with
+    shape (samples, 6), chunked and compressed. Rows and blocks are collected
+    and appended once chunk_rows are pending, flush() appends everything
+    collected so far.
+    The file is in SWMR mode, readers opened with open_swmr() can follow it
+    while recording is in progress.
+    """
+
+    def __init__(
+        self,
+        filename,
+        names,
+        types,
+        chunk_rows=DEFAULT_CHUNK_ROWS,
+        compression="lzf",
+        compression_opts=None,
+    ):
+        if h5py is None:
+            raise ImportError("h5py is required for HDF5 files")
+        dtype = serialize.get_dtype(names, types)
+        self.__names = names
+        self.__sizes = [serialize.get_item_size(t) for t in types]
+        self.__chunk_rows = chunk_rows
+        self.__file = h5py.File(filename, "w", libver="latest")
+        self.__file.attrs["names"] = ",".join(names)
+        self.__file.attrs["types"] = ",".join(types)
+        self.__datasets = []
+        for name, size in zip(names, self.__sizes):
+            field = dtype.fields[name][0]
+            # stored in native byte order, vectors have a subarray dtype
+            base = field.base.newbyteorder("=")
+            shape = (0, size) if size > 1 else (0,)
+            self.__datasets.append(
+                self.__file.create_dataset(
+                    name,
+                    shape=shape,
+                    maxshape=(None,) + shape[1:],
+                    chunks=(chunk_rows,) + shape[1:],
+                    dtype=base,
+                    compression=compression,
+                    compression_opts=compression_opts,
+                )
+            )
+        self.__file.swmr_mode = True
+        self.__samples = 0
+        # column arrays of blocks waiting to be appended, rows in columns after them
+        self.__blocks = []
+        self.__pending = 0
+        self.__reset_rows()
+
+    def writeheader(self):
+        """The datasets are created when the file is opened, kept for compatibility."""
+        pass
+
+    def writerow(self, data_object):
+        for name, column in zip(self.__names, self.__columns):
+            column.append(getattr(data_object, name))
+        self.__rows += 1
+        if self.__pending + self.__rows >= self.__chunk_rows:
+            self.__write_pending()
+
+    def writerows(self, data_objects):
+        for data_object in data_objects:
+            self.writerow(data_object)
+
+    def write_block(self, block):
+        """Appends a structured array returned by RTDE.receive_batch()"""
+        if len(block) == 0:
+            return
+        self.__collect_rows()
+        self.__blocks.append([block[name] for name in self.__names])
+        self.__pending += len(block)
+        if self.__pending >= self.__chunk_rows:
+            self.__write_pending()
+
+    def flush(self):
+        self.__write_pending()
+        self.__file.flush()
+
+    def close(self):
+        self.__write_pending()
+        self.__file.close()
+
+    def get_samples(self):
+        return self.__samples + self.__pending + self.__rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __reset_rows(self):
+        self.__columns = [[] for _ in self.__names]
+        self.__rows = 0
+
+    def __collect_rows(self):
+        # rows from writerow() into a block behind the pending ones
+        if self.__rows == 0:
+            return
+        self.__blocks.append([np.array(column) for column in self.__columns])
+        self.__pending += self.__rows
+        self.__reset_rows()
+
+    def __write_pending(self):
+        self.__collect_rows()
+        if not self.__blocks:
+            return
+        if len(self.__blocks) == 1:
+            columns = self.__blocks[0]
+        else:
+            columns = [np.concatenate(values) for values in zip(*self.__blocks)]
+        self.__append(columns, self.__pending)
+        self.__blocks = []
+        self.__pending = 0
+
+    def __append(self, columns, rows):
+        start = self.__samples
+        for dataset, values in zip(self.__datasets, columns):
+            dataset.resize(start + rows, axis=0)
+            dataset[start:] = values
+        self.__samples += rows
+        for dataset in self.__datasets:
+            dataset.flush()
@@ -0,0 +1,96 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional
+    pq = None
+
+
+class ParquetReader(object):
+    """Reads a Parquet file written by ParquetWriter.
+    Columns are read when first accessed, or all of columns up front, and
+    returned as numpy arrays: vectors with shape (samples, size). Vector
+    elements are also available as e.g. target_q_0 like with CSVReader.
+    """
+
+    def __init__(self, filename, columns=None):
+        if pq is None:
+            raise ImportError("pyarrow is required for Parquet files")
+        self.__filename = filename
+        self.__file = pq.ParquetFile(filename)
+        self.__names = self.__file.schema_arrow.names
+        self.__samples = self.__file.metadata.num_rows
+        if columns is not None:
+            self.materialize(columns)
+
+    def __getattr__(self, name):
+        # only called for columns that are not loaded yet
+        names = self.__dict__.get("_ParquetReader__names")
+        if names is None:
+            raise AttributeError(name)
+        if name in names:
+            self.materialize([name])
+            return self.__dict__[name]
+        base, _, index = name.rpartition("_")
+        if index.isdigit() and base in names:
+            values = getattr(self, base)
+            if values.ndim == 2:
+                return values[:, int(index)]
+        raise AttributeError(name)
+
+    def materialize(self, names):
+        """Read the given columns, the others are not touched"""
+        missing = [name for name in names if name not in self.__dict__]
+        if not missing:
+            return
+        table = self.__file.read(columns=missing)
+        for name in missing:
+            setattr(self, name, _to_numpy(table.column(name)))
+
+    def iter_batches(self, batch_size=65536, columns=None):
+        """Yields dictionaries from column name to numpy array per batch"""
+        for batch in self.__file.iter_batches(batch_size=batch_size, columns=columns):
+            yield dict(
+                (name, _to_numpy(column))
+                for name, column in zip(batch.schema.names, batch.columns)
+            )
+
+    @property
+    def names(self):
+        return self.__names
+
+    def get_samples(self):
+        return self.__samples
+
+    def get_name(self):
+        return self.__filename
+
+
+def _to_numpy(column):
+    if hasattr(column, "combine_chunks"):
+        column = column.combine_chunks()
+    size = getattr(column.type, "list_size", None)
+    if size is None:
+        return column.to_numpy(zero_copy_only=False)
+    return column.flatten().to_numpy(zero_copy_only=False).reshape(-1, size)
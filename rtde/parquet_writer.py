@@ -0,0 +1,171 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional
+    pa = None
+
+from rtde import serialize
+
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+_ARROW_TYPES = {
+    "DOUBLE": "float64",
+    "UINT64": "uint64",
+    "UINT32": "uint32",
+    "INT32": "int32",
+    "UINT8": "uint8",
+    "BOOL": "bool_",
+    "VECTOR3D": "float64",
+    "VECTOR6D": "float64",
+    "VECTOR6INT32": "int32",
+    "VECTOR6UINT32": "uint32",
+}
+
+
+def get_schema(names, types):
+    """Arrow schema of a recipe, vectors become fixed size lists,
+    e.g. VECTOR6D -> list<double>[6].
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required for Parquet files")
+    if len(names) != len(types):
+        raise ValueError("List sizes are not identical.")
+    fields = []
+    for name, data_type in zip(names, types):
+        if data_type not in _ARROW_TYPES:
+            raise ValueError("Unknown data type: " + data_type)
+        arrow_type = getattr(pa, _ARROW_TYPES[data_type])()
+        if data_type.startswith("VECTOR"):
+            arrow_type = pa.list_(arrow_type, serialize.get_item_size(data_type))
+        fields.append(pa.field(name, arrow_type, nullable=False))
+    return pa.schema(fields)
+
+
+class ParquetWriter(object):
+    """Writes data objects to a Parquet file with one column per variable.
+    Rows and blocks are collected and written as a row group every
+    row_group_size rows, the last one on close(). writeheader() exists for
+    compatibility with CSVWriter, the schema is written when the file is
+    opened.
+    """
+
+    def __init__(
+        self,
+        where,
+        names,
+        types,
+        row_group_size=DEFAULT_ROW_GROUP_SIZE,
+        compression="snappy",
+    ):
+        self.__schema = get_schema(names, types)
+        self.__names = names
+        self.__sizes = [serialize.get_item_size(t) for t in types]
+        self.__row_group_size = row_group_size
+        self.__writer = pq.ParquetWriter(where, self.__schema, compression=compression)
+        # tables waiting for a full row group, in order, rows in columns after them
+        self.__tables = []
+        self.__pending = 0
+        self.__reset_rows()
+
+    def writeheader(self):
+        pass
+
+    def writerow(self, data_object):
+        for name, size, column in zip(self.__names, self.__sizes, self.__columns):
+            if size > 1:
+                column.extend(getattr(data_object, name))
+            else:
+                column.append(getattr(data_object, name))
+        self.__rows += 1
+        if self.__pending + self.__rows >= self.__row_group_size:
+            self.__write_row_groups()
+
+    def writerows(self, data_objects):
+        for data_object in data_objects:
+            self.writerow(data_object)
+
+    def write_block(self, block):
+        """Writes a structured array returned by RTDE.receive_batch()"""
+        if len(block) == 0:
+            return
+        self.__collect_rows()
+        arrays = []
+        for name, size, field in zip(self.__names, self.__sizes, self.__schema):
+            values = block[name]
+            # arrow arrays are native endian
+            values = values.astype(values.dtype.newbyteorder("=")).reshape(-1)
+            arrow_type = field.type.value_type if size > 1 else field.type
+            array = pa.array(values, type=arrow_type)
+            if size > 1:
+                array = pa.FixedSizeListArray.from_arrays(array, size)
+            arrays.append(array)
+        self.__tables.append(pa.Table.from_arrays(arrays, schema=self.__schema))
+        self.__pending += len(block)
+        if self.__pending >= self.__row_group_size:
+            self.__write_row_groups()
+
+    def close(self):
+        self.__write_row_groups(final=True)
+        self.__writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __reset_rows(self):
+        self.__columns = [[] for _ in self.__names]
+        self.__rows = 0
+
+    def __write_row_groups(self, final=False):
+        # full row groups only, everything on close
+        self.__collect_rows()
+        if not self.__tables:
+            return
+        table = pa.concat_tables(self.__tables)
+        size = self.__row_group_size
+        count = table.num_rows if final else table.num_rows // size * size
+        if count:
+            self.__writer.write_table(table.slice(0, count), row_group_size=size)
+        rest = table.slice(count)
+        self.__tables = [rest] if rest.num_rows else []
+        self.__pending = rest.num_rows
+
+    def __collect_rows(self):
+        # rows from writerow() into a table behind the pending ones
+        if self.__rows == 0:
+            return
+        arrays = []
+        for size, field, column in zip(self.__sizes, self.__schema, self.__columns):
+            if size > 1:
+                values = pa.array(column, type=field.type.value_type)
+                arrays.append(pa.FixedSizeListArray.from_arrays(values, size))
+            else:
+                arrays.append(pa.array(column, type=field.type))
+        self.__tables.append(pa.Table.from_arrays(arrays, schema=self.__schema))
+        self.__pending += self.__rows
+        self.__reset_rows()
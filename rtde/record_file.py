@@ -0,0 +1,198 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Columnar binary recording format.
+
+A file starts with an 8 byte magic, a 4 byte big-endian header length and a
+JSON header holding the recipe names and types, padded with spaces to a
+multiple of 8 bytes. Fixed-width records follow, one per data package in
+the wire layout of the recipe (big-endian, no recipe id), so a payload
+received with receive(binary=True) is written as is and the reader can map
+the file straight into a numpy structured array.
+"""
+
+import json
+import struct
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only required for reading
+    np = None
+
+from . import serialize
+
+MAGIC = b"RTDEREC1"
+FORMAT_VERSION = 1
+_HEADER_LENGTH = struct.Struct(">I")
+_ALIGNMENT = 8
+
+
+def get_record_struct(types):
+    """struct.Struct of one record, the recipe format without the recipe id"""
+    recipe = b"\x00" + ",".join(types).encode("utf-8")
+    config = serialize.DataConfig.unpack_recipe(recipe)
+    return struct.Struct(">" + config.fmt[2:])
+
+
+class RecordWriter(object):
+    """Writes data packages to a file opened in binary mode"""
+
+    def __init__(self, file, names, types, metadata=None):
+        if len(names) != len(types):
+            raise ValueError("List sizes are not identical.")
+        self.__file = file
+        self.__names = list(names)
+        self.__types = list(types)
+        self.__metadata = metadata or {}
+        self.__codec = get_record_struct(types)
+        self.__layout = serialize.get_field_layout(types, offset=0)
+
+    def writeheader(self):
+        header = {
+            "version": FORMAT_VERSION,
+            "names": self.__names,
+            "types": self.__types,
+            "record_size": self.__codec.size,
+            "metadata": self.__metadata,
+        }
+        encoded = json.dumps(header, sort_keys=True).encode("utf-8")
+        used = len(MAGIC) + _HEADER_LENGTH.size + len(encoded)
+        encoded += b" " * (-used % _ALIGNMENT)
+        self.__file.write(MAGIC + _HEADER_LENGTH.pack(len(encoded)) + encoded)
+
+    def writerow(self, data_object):
+        """Writes one package, either the payload bytes returned by
+        receive(binary=True) or a decoded data object.
+        """
+        if isinstance(data_object, (bytes, bytearray, memoryview)):
+            if len(data_object) != self.__codec.size:
+                raise ValueError(
+                    "Expected %d bytes, got %d" % (self.__codec.size, len(data_object))
+                )
+            self.__file.write(data_object)
+            return
+        values = []
+        for name, (start, stop) in zip(self.__names, self.__layout):
+            value = getattr(data_object, name)
+            if stop is None:
+                values.append(value)
+            else:
+                values.extend(value)
+        self.__file.write(self.__codec.pack(*values))
+
+    def writerows(self, data_objects):
+        for data_object in data_objects:
+            self.writerow(data_object)
+
+    def write_block(self, batch):
+        """Writes a structured array returned by receive_batch"""
+        if batch.dtype.itemsize != self.__codec.size:
+            raise ValueError("Record size does not match the recipe")
+        self.__file.write(batch.tobytes())
+
+
+def read_header(file):
+    """Returns (header dict, data offset) of a recording file"""
+    magic = file.read(len(MAGIC))
+    if magic != MAGIC:
+        name = str(getattr(file, "name", ""))
+        raise ValueError("Not an RTDE recording file: " + name)
+    (length,) = _HEADER_LENGTH.unpack(file.read(_HEADER_LENGTH.size))
+    header = json.loads(file.read(length).decode("utf-8"))
+    if header["version"] > FORMAT_VERSION:
+        raise ValueError("Unsupported recording format version %d" % header["version"])
+    return header, len(MAGIC) + _HEADER_LENGTH.size + length
+
+
+class RecordReader(object):
+    """Memory-maps a recording file.
+    Every recipe variable is available as an attribute holding a read-only
+    numpy view into the file, e.g. reader.actual_TCP_pose with shape
+    (samples, 6); vector elements can also be accessed as actual_TCP_pose_0
+    like with CSVReader. Only pages that are accessed are read from disk.
+    A record cut short at the end of the file is ignored.
+    """
+
+    def __init__(self, filename):
+        if np is None:
+            raise ImportError("numpy is required to read recording files")
+        self.__filename = filename
+        with open(filename, "rb") as f:
+            header, offset = read_header(f)
+            f.seek(0, 2)
+            size = f.tell()
+        self.__names = header["names"]
+        self.__types = header["types"]
+        self.__metadata = header.get("metadata", {})
+        self.__dtype = serialize.get_dtype(self.__names, self.__types)
+        if self.__dtype.itemsize != header["record_size"]:
+            raise ValueError("Record size in header does not match the recipe")
+        self.__samples = (size - offset) // self.__dtype.itemsize
+        if self.__samples == 0:
+            self.__data = np.empty(0, dtype=self.__dtype)
+        else:
+            self.__data = np.memmap(
+                filename,
+                dtype=self.__dtype,
+                mode="r",
+                offset=offset,
+                shape=(self.__samples,),
+            )
+
+    def __getattr__(self, name):
+        # only called for names that are not regular attributes
+        data = self.__dict__.get("_RecordReader__data")
+        if data is None:
+            raise AttributeError(name)
+        if name in data.dtype.names:
+            return data[name]
+        base, _, index = name.rpartition("_")
+        if index.isdigit() and base in data.dtype.names and data[base].ndim == 2:
+            return data[base][:, int(index)]
+        raise AttributeError(name)
+
+    def __len__(self):
+        return self.__samples
+
+    @property
+    def data(self):
+        """The whole recording as a structured array"""
+        return self.__data
+
+    @property
+    def names(self):
+        return self.__names
+
+    @property
+    def types(self):
+        return self.__types
+
+    @property
+    def metadata(self):
+        return self.__metadata
+
+    def get_samples(self):
+        return self.__samples
+
+    def get_name(self):
+        return self.__filename
@@ -0,0 +1,204 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import logging
+import threading
+import time
+from collections import deque
+
+from .rtde import RTDEException, LOGNAME
+
+_log = logging.getLogger(LOGNAME)
+
+DEFAULT_QUEUE_SIZE = 100000
+DEFAULT_FLUSH_INTERVAL = 1.0
+WAIT_INTERVAL = 0.1  # longest wait for data before checking for stop
+
+
+class Recorder(object):
+    """Records data packages without letting file output delay receiving.
+    A receiver thread reads packages from con into a bounded queue and a
+    writer thread hands them to writer.writerow() in batches, flushing file
+    after each batch. A batch is written every flush_interval seconds, or
+    as soon as the queue is half full. When the writer falls behind and the
+    queue is full the oldest package is dropped; get_stats() reports drops
+    and how close the queue came to that.
+    """
+
+    def __init__(
+        self,
+        con,
+        writer,
+        file=None,
+        queue_size=DEFAULT_QUEUE_SIZE,
+        flush_interval=DEFAULT_FLUSH_INTERVAL,
+        binary=False,
+        buffered=True,
+        samples=0,
+    ):
+        self.__con = con
+        self.__writer = writer
+        self.__file = file
+        self.__flush_interval = flush_interval
+        self.__binary = binary
+        self.__buffered = buffered
+        self.__samples = samples
+        self.__queue = deque(maxlen=queue_size)
+        self.__cond = threading.Condition()
+        self.__stop = threading.Event()
+        self.__receiver = None
+        self.__writer_thread = None
+        self.__error = None
+        self.__received = 0
+        self.__written = 0
+        self.__dropped = 0
+        self.__batches = 0
+        self.__max_queue_depth = 0
+        self.__max_batch_time = 0.0
+
+    def start(self):
+        if self.__receiver is not None:
+            return self
+        self.__stop.clear()
+        self.__receiver = threading.Thread(
+            target=self.__receive_loop, name="rtde-recorder-receive"
+        )
+        self.__writer_thread = threading.Thread(
+            target=self.__write_loop, name="rtde-recorder-write"
+        )
+        for thread in (self.__receiver, self.__writer_thread):
+            thread.daemon = True
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stop receiving and wait until every queued package is written."""
+        if self.__receiver is None:
+            return
+        self.__stop.set()
+        self.__receiver.join()
+        with self.__cond:
+            self.__cond.notify_all()
+        self.__writer_thread.join()
+        self.__receiver = None
+        self.__writer_thread = None
+
+    def is_running(self):
+        """False once the connection is lost or the requested samples are in"""
+        return self.__receiver is not None and self.__receiver.is_alive()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def error(self):
+        """The exception that stopped receiving or writing, if any"""
+        return self.__error
+
+    def get_stats(self):
+        with self.__cond:
+            return {
+                "received": self.__received,
+                "written": self.__written,
+                "dropped": self.__dropped,
+                "queued": len(self.__queue),
+                "queue_size": self.__queue.maxlen,
+                "max_queue_depth": self.__max_queue_depth,
+                "batches": self.__batches,
+                "max_batch_time": self.__max_batch_time,
+                "skipped": self.__con.skipped_package_count,
+            }
+
+    def __receive_loop(self):
+        receive = self.__con.receive_buffered if self.__buffered else self.__con.receive
+        queue = self.__queue
+        threshold = queue.maxlen // 2
+        try:
+            while not self.__stop.is_set():
+                state = receive(self.__binary)
+                if state is None:
+                    if not self.__con.is_connected():
+                        raise RTDEException("Connection lost")
+                    if self.__buffered:
+                        # nothing complete buffered, sleep until the socket has data
+                        self.__con.has_data(WAIT_INTERVAL)
+                    continue
+                with self.__cond:
+                    if len(queue) == queue.maxlen:
+                        self.__dropped += 1
+                    queue.append(state)
+                    self.__received += 1
+                    if len(queue) > self.__max_queue_depth:
+                        self.__max_queue_depth = len(queue)
+                    if len(queue) == threshold:
+                        self.__cond.notify()
+                if self.__samples and self.__received >= self.__samples:
+                    break
+        except RTDEException as e:
+            _log.error("Recorder stopped receiving: " + str(e))
+            self.__error = e
+        finally:
+            with self.__cond:
+                self.__cond.notify_all()
+
+    def __write_loop(self):
+        queue = self.__queue
+        threshold = queue.maxlen // 2
+        while True:
+            with self.__cond:
+                receiving = self.__receiver.is_alive()
+                if receiving and len(queue) < threshold:
+                    self.__cond.wait(self.__flush_interval)
+                batch = list(queue)
+                queue.clear()
+            if batch:
+                try:
+                    self.__write_batch(batch)
+                except Exception as e:
+                    # stop receiving, nothing more can be written
+                    _log.error("Recorder stopped writing: " + str(e))
+                    self.__error = e
+                    self.__stop.set()
+                    return
+            elif not receiving:
+                return
+
+    def __write_batch(self, batch):
+        start = time.time()
+        writerows = getattr(self.__writer, "writerows", None)
+        if writerows is not None:
+            writerows(batch)
+        else:
+            for state in batch:
+                self.__writer.writerow(state)
+        if self.__file is not None:
+            self.__file.flush()
+        elapsed = time.time() - start
+        with self.__cond:
+            self.__written += len(batch)
+            self.__batches += 1
+            if elapsed > self.__max_batch_time:
+                self.__max_batch_time = elapsed
@@ -0,0 +1,295 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Recording split into compressed segments.
+
+RotatingWriter starts a new segment file when the current one exceeds a
+size or age limit. Closed segments are compressed on a background thread
+with zstd or lz4 when the zstandard or lz4 package is installed, gzip
+otherwise, and listed in an index file with their timestamp range, so a
+time window is found without opening any segment.
+"""
+
+import functools
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+from . import serialize
+from .csv_writer import CSVWriter
+from .record_file import RecordWriter, get_record_struct
+from .rtde import LOGNAME
+
+_log = logging.getLogger(LOGNAME)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# tell() is slow on text files, limits are checked every this many rows
+CHECK_ROWS = 256
+INDEX_SUFFIX = ".index"
+
+# name, file extension and open(filename, mode) of every codec
+CODECS = {"gzip": (".gz", functools.partial(gzip.open, compresslevel=6))}
+if lz4 is not None:
+    CODECS["lz4"] = (".lz4", lz4.frame.open)
+if zstandard is not None:
+    CODECS["zstd"] = (".zst", zstandard.open)
+
+
+def get_default_codec():
+    for codec in ("zstd", "lz4", "gzip"):
+        if codec in CODECS:
+            return codec
+
+
+def read_index(index_path):
+    """Segments listed in an index file, in recording order. Every entry has
+    the segment path, its codec, number of rows and first and last timestamp.
+    """
+    directory = os.path.dirname(index_path)
+    segments = []
+    with open(index_path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entry["path"] = os.path.join(directory, entry["segment"])
+                segments.append(entry)
+    return segments
+
+
+def find_segments(index_path, start=None, end=None):
+    """Segments holding samples with start <= timestamp <= end. Segments
+    without a timestamp range, e.g. recorded without the timestamp field, are
+    always included.
+    """
+    return [
+        entry
+        for entry in read_index(index_path)
+        if _overlaps(entry["first_timestamp"], entry["last_timestamp"], start, end)
+    ]
+
+
+def _overlaps(first, last, start, end):
+    if first is None or last is None:
+        return True
+    return (start is None or last >= start) and (end is None or first <= end)
+
+
+def open_segment(entry, mode="rb"):
+    """Open a segment from read_index() for reading, decompressing on the fly,
+    text recordings with mode "rt".
+    """
+    if entry["codec"] is None:
+        return open(entry["path"], mode.replace("t", ""))
+    if entry["codec"] not in CODECS:
+        raise ValueError("Codec not available: " + entry["codec"])
+    return CODECS[entry["codec"]][1](entry["path"], mode)
+
+
+class RotatingWriter(object):
+    """Writes rows to numbered segments next to filename, e.g.
+    robot_data.00000.csv.zst, and lists them in robot_data.index.
+    A new segment starts after max_bytes, or max_seconds if given. Text
+    segments are written by CSVWriter, binary ones (payloads received with
+    binary=True) by record_file.RecordWriter. Each segment starts with its
+    own header so it can be read on its own. Use codec=None to keep the
+    segments uncompressed. An existing index is appended to.
+    """
+
+    def __init__(
+        self,
+        filename,
+        names,
+        types,
+        max_bytes=DEFAULT_MAX_BYTES,
+        max_seconds=None,
+        binary=False,
+        codec="auto",
+        delimiter=" ",
+        float_format=None,
+    ):
+        if codec == "auto":
+            codec = get_default_codec()
+        if codec is not None and codec not in CODECS:
+            raise ValueError("Codec not available: " + str(codec))
+        self.__base, self.__ext = os.path.splitext(filename)
+        self.__names = names
+        self.__types = types
+        self.__max_bytes = max_bytes
+        self.__max_seconds = max_seconds
+        self.__binary = binary
+        self.__codec = codec
+        self.__delimiter = delimiter
+        self.__float_format = float_format
+        self.__index_path = self.__base + INDEX_SUFFIX
+
+        self.__timestamp = None
+        if "timestamp" in names:
+            if binary:
+                record = get_record_struct(types)
+                start, _ = serialize.get_field_layout(types, offset=0)[
+                    names.index("timestamp")
+                ]
+                self.__timestamp = lambda payload: record.unpack_from(payload)[start]
+            else:
+                self.__timestamp = lambda state: state.timestamp
+
+        # continue numbering when appending to an existing recording
+        self.__segment = 0
+        if os.path.exists(self.__index_path):
+            self.__segment = len(read_index(self.__index_path))
+        self.__file = None
+        self.__writer = None
+        self.__opened = None
+        self.__rows = 0
+        self.__first = None
+        self.__last = None
+
+        self.__pending = queue.Queue()
+        self.__compressor = threading.Thread(
+            target=self.__compress_loop, name="rtde-compress"
+        )
+        self.__compressor.daemon = True
+        self.__compressor.start()
+
+    @property
+    def index_path(self):
+        return self.__index_path
+
+    def writeheader(self):
+        """Segments write their header when opened, kept for compatibility."""
+        pass
+
+    def writerow(self, data_object):
+        if self.__file is None:
+            self.__open_segment()
+        self.__writer.writerow(data_object)
+        self.__rows += 1
+        self.__last = data_object
+        if self.__rows == 1:
+            self.__first = data_object
+        if self.__rows % CHECK_ROWS == 0 and (
+            self.__file.tell() >= self.__max_bytes
+            or (
+                self.__max_seconds is not None
+                and time.time() - self.__opened >= self.__max_seconds
+            )
+        ):
+            self.rotate()
+
+    def flush(self):
+        if self.__file is not None:
+            self.__file.flush()
+
+    def rotate(self):
+        """Close the current segment and queue it for compression."""
+        if self.__file is None:
+            return
+        self.__file.close()
+        entry = {
+            "segment": os.path.basename(self.__file.name),
+            "codec": None,
+            "rows": self.__rows,
+            "first_timestamp": None,
+            "last_timestamp": None,
+        }
+        if self.__timestamp is not None:
+            entry["first_timestamp"] = self.__timestamp(self.__first)
+            entry["last_timestamp"] = self.__timestamp(self.__last)
+        self.__file = None
+        self.__writer = None
+        self.__first = self.__last = None
+        self.__pending.put(entry)
+
+    def close(self):
+        """Close the current segment and wait until all are compressed."""
+        self.rotate()
+        self.__pending.put(None)
+        self.__compressor.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __open_segment(self):
+        path = "%s.%05d%s" % (self.__base, self.__segment, self.__ext)
+        self.__segment += 1
+        self.__file = open(path, "wb" if self.__binary else "w")
+        if self.__binary:
+            self.__writer = RecordWriter(self.__file, self.__names, self.__types)
+        else:
+            self.__writer = CSVWriter(
+                self.__file,
+                self.__names,
+                self.__types,
+                self.__delimiter,
+                self.__float_format,
+            )
+        self.__writer.writeheader()
+        self.__opened = time.time()
+        self.__rows = 0
+
+    def __compress_loop(self):
+        while True:
+            entry = self.__pending.get()
+            if entry is None:
+                return
+            if self.__codec is not None:
+                try:
+                    entry = self.__compress(entry)
+                except (IOError, OSError) as e:
+                    _log.error("Unable to compress %s: %s", entry["segment"], e)
+            with open(self.__index_path, "a") as index:
+                index.write(json.dumps(entry, sort_keys=True) + "\n")
+
+    def __compress(self, entry):
+        extension, open_compressed = CODECS[self.__codec]
+        directory = os.path.dirname(self.__index_path)
+        source = os.path.join(directory, entry["segment"])
+        target = source + extension
+        with open(source, "rb") as src:
+            with open_compressed(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.remove(source)
+        entry = dict(entry, segment=entry["segment"] + extension, codec=self.__codec)
+        return entry
@@ -21,18 +21,38 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import errno
 import struct
 import socket
 import select
 import sys
 import logging
+import threading
+from collections import deque
+
+try:
+    import selectors
+except ImportError:  # Python 2, polled with select.select instead
+    selectors = None
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for receive_batch
+    np = None
 
 if sys.version_info[0] < 3:
     import serialize
+    from stats import ConnectionStats, clock
+    from timestamp_monitor import TimestampMonitor
 else:
     from rtde import serialize
+    from rtde.stats import ConnectionStats, clock
+    from rtde.timestamp_monitor import TimestampMonitor
 
 DEFAULT_TIMEOUT = 1.0
+DEFAULT_BUFFER_SIZE = 256 * 1024  # initial receive buffer capacity in bytes
+MIN_RECV_SIZE = 4096  # free space guaranteed before each recv_into
+DEFAULT_HISTORY_SIZE = 10000  # packages kept by the receiver thread
 
 LOGNAME = "rtde"
 _log = logging.getLogger(LOGNAME)
@@ -73,38 +93,122 @@ class RTDETimeoutException(RTDEException):
         super(RTDETimeoutException, self).__init__(msg)
 
 
+class _SocketPoller(object):
+    """Readiness poller for one socket, registered once for its lifetime
+    (epoll on Linux) instead of rebuilding fd sets on every call.
+    """
+
+    def __init__(self, sock, write=False):
+        self.__sock = sock
+        self.__write = write
+        self.__selector = None
+        if selectors is not None:
+            self.__selector = selectors.DefaultSelector()
+            events = selectors.EVENT_WRITE if write else selectors.EVENT_READ
+            self.__selector.register(sock, events)
+
+    def wait(self, timeout):
+        """True when the socket became ready within timeout seconds"""
+        if self.__selector is not None:
+            return len(self.__selector.select(timeout)) != 0
+        if self.__write:
+            _, ready, _ = select.select([], [self.__sock], [], timeout)
+        else:
+            ready, _, _ = select.select([self.__sock], [], [], timeout)
+        return len(ready) != 0
+
+    def close(self):
+        if self.__selector is not None:
+            self.__selector.close()
+
+
+# one write for several packages, Python 3 on POSIX
+_HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+
+
+def _would_block(error):
+    return error.errno in (errno.EAGAIN, errno.EWOULDBLOCK)
+
+
+class _ChangeFilter(object):
+    """Last package sent for an input recipe in send on change mode"""
+
+    __slots__ = ["keep_alive", "sent", "sent_at"]
+
+    def __init__(self, keep_alive):
+        self.keep_alive = keep_alive
+        self.sent = None
+        self.sent_at = None
+
+    def changed(self, package, now):
+        if package != self.sent:
+            return True
+        return self.keep_alive is not None and now - self.sent_at >= self.keep_alive
+
+    def mark_sent(self, package, now):
+        self.sent = bytes(package)
+        self.sent_at = now
+
+
 class RTDE(object):
     def __init__(self, hostname, port=30004):
         self.hostname = hostname
         self.port = port
         self.__conn_state = ConnectionState.DISCONNECTED
         self.__sock = None
+        self.__read_poller = None
+        self.__write_poller = None
         self.__output_config = None
+        self.__frequency = None
+        self.__batch_dtypes = None
         self.__input_config = {}
+        self.__input_buffers = {}
+        self.__change_filters = {}
         self.__skipped_package_count = 0
+        self.__dropped_package_count = 0
+        self.__stats = ConnectionStats()
+        self.__monitor = None
+        self.__monitor_enabled = False
+        self.__timestamp_codec = None
+        self.__read_time = None
         self.__protocolVersion = RTDE_PROTOCOL_VERSION_1
+        self.__receiver = None
+        self.__receiver_cond = threading.Condition()
 
     def connect(self):
         if self.__sock:
             return
 
-        self.__buf = b""  # buffer data in binary format
+        # a receiver thread that saw the connection drop is left for its
+        # history to be read, it has finished by now
+        self.stop_receiver()
+        self.__reset_buffer()
         try:
             self.__sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.__sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.__sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.__sock.settimeout(DEFAULT_TIMEOUT)
             self.__skipped_package_count = 0
+            self.__stats.reset()
             self.__sock.connect((self.hostname, self.port))
+            # no timeout: a socket with timeout polls before every call
+            self.__sock.setblocking(False)
+            self.__read_poller = _SocketPoller(self.__sock)
+            self.__write_poller = _SocketPoller(self.__sock, write=True)
             self.__conn_state = ConnectionState.CONNECTED
         except (socket.timeout, socket.error):
+            if self.__sock:
+                self.__sock.close()
             self.__sock = None
             raise
         if not self.negotiate_protocol_version():
             raise RTDEException("Unable to negotiate protocol version")
 
     def disconnect(self):
+        self.stop_receiver()
         if self.__sock:
+            self.__read_poller.close()
+            self.__write_poller.close()
             self.__sock.close()
             self.__sock = None
         self.__conn_state = ConnectionState.DISCONNECTED
@@ -156,6 +260,11 @@ class RTDE(object):
             return None
         result.names = variables
         self.__input_config[result.id] = result
+        # whole data package, only the payload changes between sends
+        buf = bytearray(3 + result.codec.size)
+        struct.pack_into(">HB", buf, 0, len(buf), Command.RTDE_DATA_PACKAGE)
+        self.__input_buffers[result.id] = buf
+        self.__change_filters.pop(result.id, None)
         return serialize.DataObject.create_empty(variables, result.id)
 
     def send_output_setup(self, variables, types=[], frequency=125):
@@ -172,7 +281,20 @@ class RTDE(object):
             )
             return False
         result.names = variables
+        result.record = serialize.DataObject.create_record_class(
+            variables, result.layout, result.id
+        )
         self.__output_config = result
+        self.__batch_dtypes = None
+        self.__stats.period = 1.0 / frequency if frequency > 0 else None
+        self.__frequency = frequency
+        self.__timestamp_codec = self.__get_timestamp_codec(result)
+        if self.__monitor_enabled:
+            # a recipe without timestamp or a fixed frequency leaves nothing
+            # to check until the next setup
+            self.__monitor = None
+            if frequency > 0 and self.__timestamp_codec is not None:
+                self.__monitor = TimestampMonitor(frequency)
         return True
 
     def send_start(self):
@@ -186,6 +308,7 @@ class RTDE(object):
         return success
 
     def send_pause(self):
+        self.stop_receiver()
         cmd = Command.RTDE_CONTROL_PACKAGE_PAUSE
         success = self.__sendAndReceive(cmd)
         if success:
@@ -196,14 +319,72 @@ class RTDE(object):
         return success
 
     def send(self, input_data):
+        return self.send_many((input_data,))
+
+    def send_many(self, inputs):
+        """Send several input recipes, e.g. the setpoint and the watchdog of a
+        control cycle, in a single write. Each recipe is packed into its own
+        preallocated package buffer and the buffers are sent with one
+        sendmsg() call where the platform has it.
+        """
         if self.__conn_state != ConnectionState.STARTED:
             _log.error("Cannot send when RTDE synchronization is inactive")
             return
+        buffers = []
+        filtered = []
+        seen = set()
+        now = None
+        stats = self.__stats
+        for input_data in inputs:
+            if not input_data.recipe_id in self.__input_config:
+                _log.error(
+                    "Input configuration id not found: " + str(input_data.recipe_id)
+                )
+                return
+            if input_data.recipe_id in seen:
+                # Every recipe has one preallocated buffer, a second object
+                # would overwrite the first before the write.
+                _log.error(
+                    "Input recipe sent twice in one call: " + str(input_data.recipe_id)
+                )
+                return
+            seen.add(input_data.recipe_id)
+            config = self.__input_config[input_data.recipe_id]
+            buf = self.__input_buffers[input_data.recipe_id]
+            config.pack_into(buf, 3, input_data)
+            change_filter = self.__change_filters.get(input_data.recipe_id)
+            if change_filter is not None:
+                if now is None:
+                    now = clock()
+                if not change_filter.changed(buf, now):
+                    stats.packages_unchanged += 1
+                    continue
+                filtered.append((change_filter, buf))
+            buffers.append(buf)
+        if not buffers:
+            return True
+        stats.packages_sent += len(buffers)
+        if stats.timing:
+            stats.on_send()
+        success = self.__send_buffers(buffers)
+        if success:
+            for change_filter, buf in filtered:
+                change_filter.mark_sent(buf, now)
+        return success
+
+    def set_send_on_change(self, input_data, enabled=True, keep_alive=None):
+        """Make send() and send_many() skip the recipe of input_data while its
+        values equal the last ones sent. With keep_alive unchanged values are
+        sent again after that many seconds, e.g. for watchdog registers.
+        """
         if not input_data.recipe_id in self.__input_config:
-            _log.error("Input configuration id not found: " + str(input_data.recipe_id))
-            return
-        config = self.__input_config[input_data.recipe_id]
-        return self.__sendall(Command.RTDE_DATA_PACKAGE, config.pack(input_data))
+            raise RTDEException(
+                "Input configuration id not found: " + str(input_data.recipe_id)
+            )
+        if enabled:
+            self.__change_filters[input_data.recipe_id] = _ChangeFilter(keep_alive)
+        else:
+            self.__change_filters.pop(input_data.recipe_id, None)
 
     def receive(self, binary=False):
         """Recieve the latest data package.
@@ -213,9 +394,15 @@ class RTDE(object):
         """
         if self.__output_config is None:
             raise RTDEException("Output configuration not initialized")
-        if self.__conn_state != ConnectionState.STARTED:
+        if self.__receiver is not None:
+            data = self.__receive_latest(binary)
+        elif self.__conn_state != ConnectionState.STARTED:
             raise RTDEException("Cannot receive when RTDE synchronization is inactive")
-        return self.__recv(Command.RTDE_DATA_PACKAGE, binary)
+        else:
+            data = self.__recv(Command.RTDE_DATA_PACKAGE, binary)
+        if self.__stats.timing and data is not None:
+            self.__stats.on_receive(self.__backlog())
+        return data
 
     def receive_buffered(self, binary=False, buffer_limit=None):
         """Recieve the next data package.
@@ -228,22 +415,94 @@ class RTDE(object):
             logging.error("Output configuration not initialized")
             return None
 
+        if self.__receiver is not None:
+            data = self.__receive_history(binary)
+        else:
+            data = self.__receive_available(binary, buffer_limit)
+        if self.__stats.timing and data is not None:
+            self.__stats.on_receive(self.__backlog())
+        return data
+
+    def receive_batch(self, max_packets=None, buffer_limit=None):
+        """Recieve all data packages available without blocking.
+        Every complete data package in the receive buffer, up to max_packets,
+        is decoded in one step into a numpy structured array with one record
+        per package and one field per recipe variable (see
+        DataConfig.get_dtype). Returns an empty array if no data is available.
+        """
+        if self.__output_config is None:
+            raise RTDEException("Output configuration not initialized")
+        if self.__receiver is not None:
+            raise RTDEException("Cannot receive batches while the receiver thread is running")
+
         try:
             while (
                 self.is_connected()
-                and (buffer_limit == None or len(self.__buf) < buffer_limit)
+                and (buffer_limit is None or self.__buffered_size() < buffer_limit)
                 and self.__recv_to_buffer(0)
             ):
                 pass
         except RTDEException as e:
-            data = self.__recv_from_buffer(Command.RTDE_DATA_PACKAGE, binary)
-            if data == None:
+            data = self.__recv_batch_from_buffer(max_packets)
+            if len(data) == 0:
                 raise e
         else:
-            data = self.__recv_from_buffer(Command.RTDE_DATA_PACKAGE, binary)
+            data = self.__recv_batch_from_buffer(max_packets)
 
+        self.__stats.packages_received += len(data)
+        if self.__stats.timing and len(data):
+            self.__stats.on_receive(self.__backlog())
         return data
 
+    def start_receiver(self, history_size=DEFAULT_HISTORY_SIZE, binary=False):
+        """Receive and decode data packages on a background thread.
+        Each package replaces the latest state, returned without locking by
+        get_latest_state() and by receive() once it is newer than the last
+        one returned, and is queued in a history of history_size packages
+        consumed by receive_buffered(). When the history is full the oldest
+        package is dropped and counted in dropped_package_count.
+        With binary=True the raw package payloads are published instead.
+        """
+        if self.__output_config is None:
+            raise RTDEException("Output configuration not initialized")
+        if self.__conn_state != ConnectionState.STARTED:
+            raise RTDEException("Cannot receive when RTDE synchronization is inactive")
+        if self.__receiver is not None:
+            return
+        self.__history = deque(maxlen=history_size)
+        self.__latest = None
+        self.__latest_seq = 0
+        self.__consumed_seq = 0
+        self.__dropped_package_count = 0
+        self.__receiver_binary = binary
+        self.__receiver_stop = threading.Event()
+        self.__receiver = threading.Thread(
+            target=self.__receive_loop, name="rtde-receiver"
+        )
+        self.__receiver.daemon = True
+        self.__receiver.start()
+
+    def stop_receiver(self):
+        """Stop the receiver thread, subsequent receive calls read the socket."""
+        receiver = self.__receiver
+        if receiver is None:
+            return
+        self.__receiver_stop.set()
+        if receiver is threading.current_thread():
+            # disconnected by the receiver itself, keep the history readable
+            return
+        receiver.join()
+        self.__receiver = None
+
+    def is_receiver_running(self):
+        return self.__receiver is not None and self.__receiver.is_alive()
+
+    def get_latest_state(self):
+        """The newest package published by the receiver thread, or None."""
+        if self.__receiver is None:
+            return None
+        return self.__latest
+
     def send_message(
         self, message, source="Python Client", type=serialize.Message.INFO_MESSAGE
     ):
@@ -273,6 +532,10 @@ class RTDE(object):
             _log.error("Unknown package command: " + str(cmd))
 
     def __sendAndReceive(self, cmd, payload=b""):
+        if self.__receiver is not None:
+            raise RTDEException(
+                "Cannot exchange commands while the receiver thread is running"
+            )
         if self.__sendall(cmd, payload):
             return self.__recv(cmd)
         else:
@@ -286,19 +549,45 @@ class RTDE(object):
         if self.__sock is None:
             _log.error("Unable to send: not connected to Robot")
             return False
+        self.__stats.on_bytes(clock(), sent=size)
+        return self.__write(buf)
 
-        _, writable, _ = select.select([], [self.__sock], [], DEFAULT_TIMEOUT)
-        if len(writable):
-            self.__sock.sendall(buf)
-            return True
-        else:
-            self.__trigger_disconnected()
+    def __send_buffers(self, buffers):
+        if self.__sock is None:
+            _log.error("Unable to send: not connected to Robot")
             return False
+        size = sum(len(buf) for buf in buffers)
+        self.__stats.on_bytes(clock(), sent=size)
+        if not _HAS_SENDMSG:
+            return self.__write(b"".join(buffers))
+        try:
+            sent = self.__sock.sendmsg(buffers)
+        except socket.error as e:
+            if not _would_block(e):
+                raise
+            sent = 0
+        if sent == size:
+            return True
+        return self.__write(b"".join(buffers)[sent:])
+
+    def __write(self, buf):
+        # the send buffer is rarely full, only wait for it when it is
+        view = memoryview(buf)
+        sent = 0
+        while sent < len(buf):
+            try:
+                sent += self.__sock.send(view[sent:])
+            except socket.error as e:
+                if not _would_block(e):
+                    raise
+                if not self.__write_poller.wait(DEFAULT_TIMEOUT):
+                    self.__trigger_disconnected()
+                    return False
+        return True
 
-    def has_data(self):
-        timeout = 0
-        readable, _, _ = select.select([self.__sock], [], [], timeout)
-        return len(readable) != 0
+    def has_data(self, timeout=0):
+        """True when the socket has data to read, waits up to timeout seconds"""
+        return self.__read_poller.wait(timeout)
 
     def __recv(self, command, binary=False):
         while self.is_connected():
@@ -308,78 +597,311 @@ class RTDE(object):
                 return None
 
             # unpack_from requires a buffer of at least 3 bytes
-            while len(self.__buf) >= 3:
+            while self.__buffered_size() >= 3:
                 # Attempts to extract a packet
-                packet_header = serialize.ControlHeader.unpack(self.__buf)
+                packet_header = serialize.ControlHeader.unpack(
+                    self.__view, self.__buf_start
+                )
 
-                if len(self.__buf) >= packet_header.size:
-                    packet, self.__buf = (
-                        self.__buf[3 : packet_header.size],
-                        self.__buf[packet_header.size :],
-                    )
-                    data = self.__on_packet(packet_header.command, packet)
-                    if len(self.__buf) >= 3 and command == Command.RTDE_DATA_PACKAGE:
-                        next_packet_header = serialize.ControlHeader.unpack(self.__buf)
+                if self.__buffered_size() >= packet_header.size:
+                    start = self.__buf_start + 3
+                    end = self.__buf_start + packet_header.size
+                    self.__buf_start = end
+                    if (
+                        self.__monitor is not None
+                        and packet_header.command == Command.RTDE_DATA_PACKAGE
+                    ):
+                        self.__observe_timestamp(start)
+                    if (
+                        packet_header.command == Command.RTDE_DATA_PACKAGE
+                        and command == Command.RTDE_DATA_PACKAGE
+                        and self.__buffered_size() >= 3
+                    ):
+                        next_packet_header = serialize.ControlHeader.unpack(
+                            self.__view, self.__buf_start
+                        )
                         if next_packet_header.command == command:
                             _log.debug("skipping package(1)")
                             self.__skipped_package_count += 1
                             continue
                     if packet_header.command == command:
                         if binary:
-                            return packet[1:]
+                            return self.__binary_data_package(start, end)
 
-                        return data
+                        return self.__on_packet(
+                            packet_header.command, self.__packet(command, start, end)
+                        )
                     else:
+                        self.__on_packet(
+                            packet_header.command,
+                            self.__packet(packet_header.command, start, end),
+                        )
                         _log.debug("skipping package(2)")
                 else:
                     break
         raise RTDEException(" _recv() Connection lost ")
 
     def __recv_to_buffer(self, timeout):
-        readable, _, xlist = select.select([self.__sock], [], [self.__sock], timeout)
-        if len(readable):
-            more = self.__sock.recv(4096)
-            # When the controller stops while the script is running
-            if len(more) == 0:
-                _log.error(
-                    "received 0 bytes from Controller, probable cause: Controller has stopped"
-                )
-                self.__trigger_disconnected()
-                raise RTDEException("received 0 bytes from Controller")
-
-            self.__buf = self.__buf + more
-            return True
-
-        if (
-            len(xlist) or len(readable) == 0
-        ) and timeout != 0:  # Effectively a timeout of timeout seconds
+        # Blocking reads wait for the socket first since the next package is
+        # usually not there yet, non-blocking reads just try to read.
+        if timeout != 0 and not self.__read_poller.wait(timeout):
             _log.warning("no data received in last %d seconds ", timeout)
             raise RTDETimeoutException("no data received within timeout")
 
-        return False
+        self.__reserve_buffer(MIN_RECV_SIZE)
+        try:
+            received = self.__sock.recv_into(self.__view[self.__buf_end :])
+        except socket.error as e:
+            if _would_block(e):
+                return False
+            raise
+        # When the controller stops while the script is running
+        if received == 0:
+            _log.error(
+                "received 0 bytes from Controller, probable cause: Controller has stopped"
+            )
+            self.__trigger_disconnected()
+            raise RTDEException("received 0 bytes from Controller")
+
+        self.__buf_end += received
+        # every read, packages buffered before stats or the monitor were
+        # enabled still need their read time
+        self.__read_time = clock()
+        self.__stats.on_bytes(self.__read_time, received=received)
+        return True
 
     def __recv_from_buffer(self, command, binary=False):
         # unpack_from requires a buffer of at least 3 bytes
-        while len(self.__buf) >= 3:
+        while self.__buffered_size() >= 3:
             # Attempts to extract a packet
-            packet_header = serialize.ControlHeader.unpack(self.__buf)
+            packet_header = serialize.ControlHeader.unpack(
+                self.__view, self.__buf_start
+            )
 
-            if len(self.__buf) >= packet_header.size:
-                packet, self.__buf = (
-                    self.__buf[3 : packet_header.size],
-                    self.__buf[packet_header.size :],
+            if self.__buffered_size() >= packet_header.size:
+                start = self.__buf_start + 3
+                end = self.__buf_start + packet_header.size
+                self.__buf_start = end
+                if (
+                    self.__monitor is not None
+                    and packet_header.command == Command.RTDE_DATA_PACKAGE
+                ):
+                    self.__observe_timestamp(start)
+                if packet_header.command == command and binary:
+                    return self.__binary_data_package(start, end)
+                data = self.__on_packet(
+                    packet_header.command,
+                    self.__packet(packet_header.command, start, end),
                 )
-                data = self.__on_packet(packet_header.command, packet)
                 if packet_header.command == command:
-                    if binary:
-                        return packet[1:]
-
                     return data
                 else:
                     _log.debug("skipping package(2)")
             else:
                 return None
 
+    def __receive_available(self, binary, buffer_limit):
+        try:
+            while (
+                self.is_connected()
+                and (buffer_limit == None or self.__buffered_size() < buffer_limit)
+                and self.__recv_to_buffer(0)
+            ):
+                pass
+        except RTDEException as e:
+            data = self.__recv_from_buffer(Command.RTDE_DATA_PACKAGE, binary)
+            if data == None:
+                raise e
+        else:
+            data = self.__recv_from_buffer(Command.RTDE_DATA_PACKAGE, binary)
+
+        return data
+
+    def __receive_loop(self):
+        try:
+            while not self.__receiver_stop.is_set() and self.is_connected():
+                try:
+                    self.__recv_to_buffer(DEFAULT_TIMEOUT)
+                except RTDETimeoutException:
+                    continue
+                while True:
+                    data = self.__recv_from_buffer(
+                        Command.RTDE_DATA_PACKAGE, self.__receiver_binary
+                    )
+                    if data is None:
+                        break
+                    self.__publish(data)
+        except (RTDEException, socket.error) as e:
+            _log.error("RTDE receiver stopped: " + str(e))
+        finally:
+            with self.__receiver_cond:
+                self.__receiver_cond.notify_all()
+
+    def __publish(self, data):
+        with self.__receiver_cond:
+            if len(self.__history) == self.__history.maxlen:
+                self.__dropped_package_count += 1
+            self.__history.append(data)
+            self.__latest = data
+            self.__latest_seq += 1
+            self.__receiver_cond.notify_all()
+
+    def __check_receiver_mode(self, binary):
+        if binary != self.__receiver_binary:
+            raise RTDEException(
+                "Receiver thread was started with binary=" + str(self.__receiver_binary)
+            )
+
+    def __receive_latest(self, binary):
+        self.__check_receiver_mode(binary)
+        with self.__receiver_cond:
+            if self.__latest_seq == self.__consumed_seq and self.__receiver.is_alive():
+                self.__receiver_cond.wait(DEFAULT_TIMEOUT)
+            if self.__latest_seq == self.__consumed_seq:
+                if not self.__receiver.is_alive():
+                    raise RTDEException(" _recv() Connection lost ")
+                return None
+            self.__consumed_seq = self.__latest_seq
+            return self.__latest
+
+    def __receive_history(self, binary):
+        self.__check_receiver_mode(binary)
+        with self.__receiver_cond:
+            if self.__history:
+                return self.__history.popleft()
+            if not self.__receiver.is_alive():
+                raise RTDEException(" _recv() Connection lost ")
+            return None
+
+    def __get_batch_dtypes(self):
+        if np is None:
+            raise ImportError("numpy is required for receive_batch")
+        if self.__batch_dtypes is None:
+            config = self.__output_config
+            record = config.get_dtype()
+            packet_size = 3 + config.codec.size
+            # views over consecutive packages: header fields and the recipe
+            # fields behind the 3 byte header and the recipe id
+            header = np.dtype(
+                {
+                    "names": ["size", "command", "recipe_id"],
+                    "formats": [">u2", "u1", "u1"],
+                    "offsets": [0, 2, 3],
+                    "itemsize": packet_size,
+                }
+            )
+            payload = np.dtype(
+                {
+                    "names": record.names,
+                    "formats": [record.fields[n][0] for n in record.names],
+                    "offsets": [4 + record.fields[n][1] for n in record.names],
+                    "itemsize": packet_size,
+                }
+            )
+            self.__batch_dtypes = (packet_size, header, payload, record)
+        return self.__batch_dtypes
+
+    def __recv_batch_from_buffer(self, max_packets=None):
+        packet_size, header, payload, record = self.__get_batch_dtypes()
+        recipe_id = self.__output_config.id
+        batches = []
+        received = 0
+        while max_packets is None or received < max_packets:
+            count = self.__buffered_size() // packet_size
+            if max_packets is not None:
+                count = min(count, max_packets - received)
+            if count:
+                headers = np.frombuffer(
+                    self.__buf, dtype=header, count=count, offset=self.__buf_start
+                )
+                valid = (
+                    (headers["size"] == packet_size)
+                    & (headers["command"] == Command.RTDE_DATA_PACKAGE)
+                    & (headers["recipe_id"] == recipe_id)
+                )
+                n = count if valid.all() else int(valid.argmin())
+                if n:
+                    packets = np.frombuffer(
+                        self.__buf, dtype=payload, count=n, offset=self.__buf_start
+                    )
+                    if self.__stats.timing:
+                        start = clock()
+                        batches.append(packets.astype(record))
+                        self.__stats.on_decoded_batch(
+                            self.__read_time, start, clock(), n
+                        )
+                    else:
+                        batches.append(packets.astype(record))
+                    if self.__monitor is not None and "timestamp" in record.names:
+                        for timestamp in batches[-1]["timestamp"].tolist():
+                            self.__monitor.update(timestamp, self.__read_time)
+                    self.__buf_start += n * packet_size
+                    received += n
+                    continue
+
+            # the next packet is incomplete or not a data package
+            if self.__buffered_size() < 3:
+                break
+            packet_header = serialize.ControlHeader.unpack(
+                self.__view, self.__buf_start
+            )
+            if self.__buffered_size() < packet_header.size:
+                break
+            start = self.__buf_start + 3
+            end = self.__buf_start + packet_header.size
+            self.__buf_start = end
+            self.__on_packet(
+                packet_header.command,
+                self.__packet(packet_header.command, start, end),
+            )
+            _log.debug("skipping package(2)")
+
+        if len(batches) == 1:
+            return batches[0]
+        if len(batches) == 0:
+            return np.empty(0, dtype=record)
+        return np.concatenate(batches)
+
+    def __reset_buffer(self, size=DEFAULT_BUFFER_SIZE):
+        # Packets are framed in place by offset arithmetic: [__buf_start, __buf_end)
+        # holds received bytes that have not been consumed yet.
+        self.__buf = bytearray(size)
+        self.__view = memoryview(self.__buf)
+        self.__buf_start = 0
+        self.__buf_end = 0
+
+    def __buffered_size(self):
+        return self.__buf_end - self.__buf_start
+
+    def __reserve_buffer(self, size):
+        """Make room for at least size bytes after the buffered data.
+        Pending bytes are moved to the front of the buffer when the tail is
+        exhausted, and the buffer only grows when it is genuinely full, so the
+        cost of draining a backlog stays linear in the number of bytes.
+        """
+        if len(self.__buf) - self.__buf_end >= size:
+            return
+        pending = self.__buffered_size()
+        if pending + size > len(self.__buf):
+            capacity = len(self.__buf)
+            while capacity < pending + size:
+                capacity *= 2
+            buf = bytearray(capacity)
+            buf[:pending] = self.__view[self.__buf_start : self.__buf_end]
+            self.__buf = buf
+            self.__view = memoryview(buf)
+        elif pending:
+            self.__view[:pending] = self.__view[self.__buf_start : self.__buf_end]
+        self.__buf_start = 0
+        self.__buf_end = pending
+
+    def __packet(self, command, start, end):
+        # Data packages are decoded straight from the receive buffer, the rare
+        # control packages are copied since they are kept or decoded as text.
+        if command == Command.RTDE_DATA_PACKAGE:
+            return self.__view[start:end]
+        return bytes(self.__view[start:end])
+
     def __trigger_disconnected(self):
         _log.info("RTDE disconnected")
         self.disconnect()  # clean-up
@@ -449,9 +971,49 @@ class RTDE(object):
         if output_config is None:
             _log.error("RTDE_DATA_PACKAGE: Missing output configuration")
             return None
-        output = output_config.unpack(payload)
+        stats = self.__stats
+        stats.packages_received += 1
+        if not stats.timing:
+            output = output_config.unpack(payload)
+        else:
+            start = clock()
+            output = output_config.unpack(payload)
+            stats.on_decoded(self.__read_time, start, clock())
+        if self.__monitor is not None:
+            output.host_time = self.__read_time
+        return output
+
+    def __binary_data_package(self, start, end):
+        # payload without the recipe id
+        stats = self.__stats
+        stats.packages_received += 1
+        if not stats.timing:
+            return bytes(self.__view[start + 1 : end])
+        copy_start = clock()
+        output = bytes(self.__view[start + 1 : end])
+        stats.on_decoded(self.__read_time, copy_start, clock())
         return output
 
+    def __get_timestamp_codec(self, config):
+        # reads the timestamp field of a data package at its offset
+        if "timestamp" not in config.names:
+            return None
+        index = config.layout[config.names.index("timestamp")][0]
+        offset = struct.calcsize(">" + config.fmt[1 : index + 1])
+        codec = struct.Struct(">d")
+        return lambda buf, start: codec.unpack_from(buf, start + offset)[0]
+
+    def __observe_timestamp(self, start):
+        if self.__timestamp_codec is not None:
+            timestamp = self.__timestamp_codec(self.__view, start)
+            self.__monitor.update(timestamp, self.__read_time)
+
+    def __backlog(self):
+        # data packages received but not returned yet
+        if self.__receiver is not None:
+            return len(self.__history)
+        return self.__buffered_size() // (3 + self.__output_config.codec.size)
+
     def __list_equals(self, l1, l2):
         if len(l1) != len(l2):
             return False
@@ -465,6 +1027,54 @@ class RTDE(object):
         """The skipped package count, resets on connect"""
         return self.__skipped_package_count
 
+    @property
+    def dropped_package_count(self):
+        """Packages dropped from the full receiver history, resets on start_receiver"""
+        return self.__dropped_package_count
+
+    def enable_stats(self, timing=True):
+        """Record the timing histograms of ConnectionStats in addition to the
+        byte and package counters that are always kept.
+        """
+        self.__stats.timing = timing
+
+    def stats(self):
+        """Snapshot of the connection statistics as a dictionary, see
+        ConnectionStats. Counters reset on connect and reset_stats().
+        """
+        return self.__stats.snapshot(
+            self.__skipped_package_count, self.__dropped_package_count
+        )
+
+    def reset_stats(self):
+        self.__stats.reset()
+
+    def enable_timestamp_monitor(self):
+        """Check the controller timestamp of every data package, including
+        the ones receive() skips, for missing cycles and estimate the
+        controller clock on the host clock, see TimestampMonitor. Decoded
+        states get host_time, the rtde.stats.clock() time their data was
+        read from the socket. Call after send_output_setup() with timestamp
+        in the recipe.
+        """
+        if self.__timestamp_codec is None:
+            raise RTDEException("timestamp is not in the output recipe")
+        if not self.__frequency or self.__frequency <= 0:
+            raise RTDEException(
+                "Timestamp monitor needs a positive output frequency, not "
+                + str(self.__frequency)
+            )
+        self.__monitor = TimestampMonitor(self.__frequency)
+        self.__monitor_enabled = True
+        return self.__monitor
+
+    @property
+    def timestamp_monitor(self):
+        """The TimestampMonitor, None unless enabled and the output recipe
+        has timestamp and a positive frequency
+        """
+        return self.__monitor
+
 
 
 
@@ -21,8 +21,15 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import keyword
+import re
 import struct
 
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for batch decoding
+    np = None
+
 
 class ControlHeader(object):
     __slots__ = [
@@ -31,9 +38,9 @@ class ControlHeader(object):
     ]
 
     @staticmethod
-    def unpack(buf):
+    def unpack(buf, offset=0):
         rmd = ControlHeader()
-        (rmd.size, rmd.command) = struct.unpack_from(">HB", buf)
+        (rmd.size, rmd.command) = struct.unpack_from(">HB", buf, offset)
         return rmd
 
 
@@ -95,6 +102,9 @@ class Message(object):
         return rmd
 
 
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
 def get_item_size(data_type):
     if data_type.startswith("VECTOR6"):
         return 6
@@ -103,55 +113,139 @@ def get_item_size(data_type):
     return 1
 
 
-def unpack_field(data, offset, data_type):
-    size = get_item_size(data_type)
-    if data_type == "VECTOR6D" or data_type == "VECTOR3D":
-        return [float(data[offset + i]) for i in range(size)]
-    elif data_type == "VECTOR6UINT32":
-        return [int(data[offset + i]) for i in range(size)]
-    elif data_type == "DOUBLE":
-        return float(data[offset])
-    elif data_type == "UINT32" or data_type == "UINT64":
-        return int(data[offset])
-    elif data_type == "VECTOR6INT32":
-        return [int(data[offset + i]) for i in range(size)]
-    elif data_type == "INT32" or data_type == "UINT8":
-        return int(data[offset])
-    elif data_type == "BOOL":
-        return bool(data[offset])
-    raise ValueError("unpack_field: unknown data type: " + data_type)
-
-
-class DataObject(object):
+def get_field_layout(types, offset=1):
+    """Position of every field in a flat value tuple, offset past the recipe id.
+    Scalars map to (index, None), vectors to the (start, stop) slice bounds.
+    """
+    layout = []
+    for data_type in types:
+        if data_type.startswith("VECTOR"):
+            size = get_item_size(data_type)
+            layout.append((offset, offset + size))
+            offset += size
+        else:
+            layout.append((offset, None))
+            offset += 1
+    return tuple(layout)
+
+
+_NUMPY_TYPES = {
+    "DOUBLE": ">f8",
+    "UINT64": ">u8",
+    "UINT32": ">u4",
+    "INT32": ">i4",
+    "UINT8": "u1",
+    "BOOL": "?",
+    "VECTOR3D": ">f8",
+    "VECTOR6D": ">f8",
+    "VECTOR6INT32": ">i4",
+    "VECTOR6UINT32": ">u4",
+}
+
+
+def get_dtype(names, types):
+    """Big-endian numpy record type matching the wire layout of a recipe,
+    vectors become subarray fields, e.g. VECTOR6D -> ('>f8', (6,)).
+    """
+    if np is None:
+        raise ImportError("numpy is required for structured array decoding")
+    if len(names) != len(types):
+        raise ValueError("List sizes are not identical.")
+    fields = []
+    for name, data_type in zip(names, types):
+        if data_type not in _NUMPY_TYPES:
+            raise ValueError("Unknown data type: " + data_type)
+        if data_type.startswith("VECTOR"):
+            fields.append((name, _NUMPY_TYPES[data_type], (get_item_size(data_type),)))
+        else:
+            fields.append((name, _NUMPY_TYPES[data_type]))
+    return np.dtype(fields)
+
+
+class DataFields(object):
+    """Base of DataObject and the generated record classes, to check
+    received states with isinstance(state, DataFields)
+    """
+
+    __slots__ = ()
     recipe_id = None
 
-    def pack(self, names, types):
+    def pack(self, names, types, layout=None):
         if len(names) != len(types):
             raise ValueError("List sizes are not identical.")
+        if layout is None:
+            layout = get_field_layout(types)
         l = []
         if self.recipe_id is not None:
             l.append(self.recipe_id)
-        for i in range(len(names)):
-            if self.__dict__[names[i]] is None:
-                raise ValueError("Uninitialized parameter: " + names[i])
-            if types[i].startswith("VECTOR"):
-                l.extend(self.__dict__[names[i]])
+        for name, (_, stop) in zip(names, layout):
+            value = getattr(self, name)
+            if value is None:
+                raise ValueError("Uninitialized parameter: " + name)
+            if stop is not None:
+                l.extend(value)
             else:
-                l.append(self.__dict__[names[i]])
+                l.append(value)
         return l
 
+
+class DataRecord(DataFields):
+    """Base of the record classes generated per output recipe, instances
+    hold their fields in __slots__ and have no __dict__.
+    """
+
+    __slots__ = ("host_time",)  # set when RTDE runs a TimestampMonitor
+
+
+class DataObject(DataFields):
+    """Input data objects, fields in __dict__"""
+
+    host_time = None  # set when RTDE runs a TimestampMonitor
+
     @staticmethod
-    def unpack(data, names, types):
+    def unpack(data, names, types, layout=None):
         if len(names) != len(types):
             raise ValueError("List sizes are not identical.")
+        if layout is None:
+            layout = get_field_layout(types)
         obj = DataObject()
-        offset = 0
         obj.recipe_id = data[0]
-        for i in range(len(names)):
-            obj.__dict__[names[i]] = unpack_field(data[1:], offset, types[i])
-            offset += get_item_size(types[i])
+        values = obj.__dict__
+        for name, (start, stop) in zip(names, layout):
+            if stop is None:
+                values[name] = data[start]
+            else:
+                values[name] = list(data[start:stop])
         return obj
 
+    @staticmethod
+    def create_record_class(names, layout, recipe_id):
+        """Generate a DataRecord subclass specialised for one output recipe.
+        Fields live in __slots__ and the generated constructor assigns them
+        straight from the unpacked value tuple, so decoding a package builds
+        a single object without per-field type dispatch.
+        """
+        lines = ["def __init__(self, data):", "    self.host_time = None"]
+        for name, (start, stop) in zip(names, layout):
+            if not _IDENTIFIER.match(name) or keyword.iskeyword(name):
+                raise ValueError("Invalid field name: " + name)
+            if stop is None:
+                lines.append("    self.%s = data[%d]" % (name, start))
+            else:
+                items = ", ".join("data[%d]" % i for i in range(start, stop))
+                lines.append("    self.%s = [%s]" % (name, items))
+        namespace = {}
+        exec("\n".join(lines), namespace)
+        return type(
+            "DataObject_%d" % recipe_id,
+            (DataRecord,),
+            {
+                "__slots__": tuple(sorted(set(names) - set(DataRecord.__slots__))),
+                "__init__": namespace["__init__"],
+                "recipe_id": recipe_id,
+            },
+        )
+
     @staticmethod
     def create_empty(names, recipe_id):
         obj = DataObject()
@@ -162,7 +256,7 @@ class DataObject(object):
 
 
 class DataConfig(object):
-    __slots__ = ["id", "names", "types", "fmt"]
+    __slots__ = ["id", "names", "types", "fmt", "codec", "layout", "record"]
 
     @staticmethod
     def unpack_recipe(buf):
@@ -195,12 +289,25 @@ class DataConfig(object):
                 raise ValueError("An input parameter is already in use.")
             else:
                 raise ValueError("Unknown data type: " + i)
+        # compiled once per recipe and reused for every package
+        rmd.codec = struct.Struct(rmd.fmt)
+        rmd.layout = get_field_layout(rmd.types)
+        rmd.record = None
         return rmd
 
     def pack(self, state):
-        l = state.pack(self.names, self.types)
-        return struct.pack(self.fmt, *l)
+        l = state.pack(self.names, self.types, self.layout)
+        return self.codec.pack(*l)
+
+    def pack_into(self, buf, offset, state):
+        l = state.pack(self.names, self.types, self.layout)
+        self.codec.pack_into(buf, offset, *l)
+
+    def get_dtype(self):
+        return get_dtype(self.names, self.types)
 
     def unpack(self, data):
-        li = struct.unpack_from(self.fmt, data)
-        return DataObject.unpack(li, self.names, self.types)
+        li = self.codec.unpack_from(data)
+        if self.record is not None:
+            return self.record(li)
+        return DataObject.unpack(li, self.names, self.types, self.layout)
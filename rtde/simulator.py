@@ -0,0 +1,485 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import logging
+import re
+import select
+import socket
+import struct
+import threading
+import time
+
+from . import serialize
+from .rtde import Command, LOGNAME
+
+_log = logging.getLogger(LOGNAME)
+
+_clock = getattr(time, "monotonic", time.time)
+
+_OUTPUT_VARIABLES = (
+    (
+        "DOUBLE",
+        "timestamp actual_execution_time speed_scaling target_speed_fraction "
+        "actual_momentum actual_main_voltage actual_robot_voltage "
+        "actual_robot_current joint_position_deviation_ratio payload io_current "
+        "tcp_force_scalar standard_analog_input0 standard_analog_input1 "
+        "standard_analog_output0 standard_analog_output1 tool_analog_input0 "
+        "tool_analog_input1 tool_output_current tool_temperature "
+        "euromap67_24V_voltage euromap67_24V_current",
+    ),
+    (
+        "VECTOR6D",
+        "target_q target_qd target_qdd target_current target_moment actual_q "
+        "actual_qd actual_current joint_control_output actual_TCP_pose "
+        "actual_TCP_speed actual_TCP_force target_TCP_pose target_TCP_speed "
+        "joint_temperatures actual_joint_voltage payload_inertia ft_raw_wrench "
+        "actual_current_window tcp_offset",
+    ),
+    (
+        "VECTOR3D",
+        "actual_tool_accelerometer payload_cog elbow_position elbow_velocity",
+    ),
+    (
+        "UINT64",
+        "actual_digital_input_bits actual_digital_output_bits "
+        "actual_configurable_digital_input_bits "
+        "actual_configurable_digital_output_bits",
+    ),
+    (
+        "UINT32",
+        "runtime_state script_control_line robot_status_bits safety_status_bits "
+        "tool_mode analog_io_types tool_analog_input_types euromap67_input_bits "
+        "euromap67_output_bits",
+    ),
+    (
+        "INT32",
+        "robot_mode safety_status safety_mode tool_output_voltage encoder0_raw "
+        "encoder1_raw",
+    ),
+    ("VECTOR6INT32", "joint_mode"),
+    ("UINT8", "tool_output_mode tool_digital_output0_mode tool_digital_output1_mode"),
+)
+
+_INPUT_VARIABLES = (
+    (
+        "UINT8",
+        "standard_digital_output_mask standard_digital_output "
+        "configurable_digital_output_mask configurable_digital_output "
+        "tool_digital_output_mask tool_digital_output standard_analog_output_mask "
+        "standard_analog_output_type",
+    ),
+    ("UINT32", "speed_slider_mask"),
+    ("DOUBLE", "speed_slider_fraction standard_analog_output_0 standard_analog_output_1"),
+    ("VECTOR6D", "external_force_torque"),
+)
+
+_REGISTERS = (
+    (re.compile(r"^(input|output)_bit_registers(0_to_31|32_to_63)$"), "UINT32"),
+    (re.compile(r"^(input|output)_bit_register_\d+$"), "BOOL"),
+    (re.compile(r"^(input|output)_int_register_\d+$"), "INT32"),
+    (re.compile(r"^(input|output)_double_register_\d+$"), "DOUBLE"),
+)
+
+_DEFAULT_VALUES = {
+    "robot_mode": 7,  # RUNNING
+    "safety_mode": 1,  # NORMAL
+    "safety_status": 1,
+    "runtime_state": 1,  # STOPPED
+    "speed_scaling": 1.0,
+    "target_speed_fraction": 1.0,
+}
+
+
+def _variable_table(groups):
+    table = {}
+    for data_type, names in groups:
+        for name in names.split():
+            table[name] = data_type
+    return table
+
+
+OUTPUT_TYPES = _variable_table(_OUTPUT_VARIABLES)
+INPUT_TYPES = _variable_table(_INPUT_VARIABLES)
+
+
+def get_variable_type(name, inputs=False):
+    """RTDE type of a controller variable, NOT_FOUND for unknown names.
+    Registers of both directions can be read, only input variables written.
+    """
+    for pattern, data_type in _REGISTERS:
+        if pattern.match(name):
+            if inputs and not name.startswith("input_"):
+                return "NOT_FOUND"
+            return data_type
+    if name in INPUT_TYPES:
+        return INPUT_TYPES[name]
+    if inputs:
+        return "NOT_FOUND"
+    return OUTPUT_TYPES.get(name, "NOT_FOUND")
+
+
+def _default_value(data_type):
+    if data_type.startswith("VECTOR"):
+        value = 0.0 if data_type.endswith("D") else 0
+        return [value] * serialize.get_item_size(data_type)
+    if data_type == "DOUBLE":
+        return 0.0
+    if data_type == "BOOL":
+        return False
+    return 0
+
+
+class _Session(object):
+    """State of one client connection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.send_lock = threading.Lock()
+        self.protocol_version = 1
+        self.next_recipe_id = 1
+        self.output = None
+        self.frequency = 125.0
+        self.inputs = {}
+        self.started = False
+
+
+class RTDESimulator(object):
+    """Loopback RTDE controller for tests and benchmarks without hardware.
+
+    Speaks the protocol implemented by rtde.RTDE: protocol version and
+    controller version requests, output and input recipe setup, start and
+    pause, text messages and data packages. Values of all variables live in
+    one table: inputs written by clients update it and outputs are sampled
+    from it, see set_value() and get_value(). Data packages are sent at the
+    frequency requested by send_output_setup, unless frequency overrides it
+    for all clients; frequency=0 sends as fast as possible. The controller
+    timestamp advances by one period per package, with host_timestamps it is
+    the time.monotonic() time the package is sent instead, to measure
+    latency from another process on the same host.
+
+        with RTDESimulator() as sim:
+            con = rtde.RTDE("127.0.0.1", sim.port)
+    """
+
+    BURST = 64  # packages per write when sending as fast as possible
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        frequency=None,
+        version=(5, 11, 0, 0),
+        host_timestamps=False,
+    ):
+        self.host = host
+        self.__requested_port = port
+        self.frequency = frequency
+        self.version = version
+        self.host_timestamps = host_timestamps
+        self.__values = dict(_DEFAULT_VALUES)
+        self.__lock = threading.Lock()
+        self.__input_owners = {}
+        self.__sessions = []
+        self.__threads = []
+        self.__listener = None
+        self.__running = threading.Event()
+        self.__sent_package_count = 0
+
+    @property
+    def port(self):
+        return self.__listener.getsockname()[1]
+
+    @property
+    def sent_package_count(self):
+        """Data packages sent to all clients since start"""
+        return self.__sent_package_count
+
+    def start(self):
+        self.__listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__listener.bind((self.host, self.__requested_port))
+        self.__listener.listen(8)
+        # accept() is not woken up by close(), poll the running flag instead
+        self.__listener.settimeout(0.1)
+        self.__running.set()
+        self.__start_thread(self.__accept_loop)
+        _log.info("RTDE simulator listening on %s:%d", self.host, self.port)
+        return self
+
+    def stop(self):
+        self.__running.clear()
+        if self.__listener:
+            self.__listener.close()
+        for session in list(self.__sessions):
+            session.conn.close()
+        for thread in self.__threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        self.__threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def set_value(self, name, value):
+        with self.__lock:
+            self.__values[name] = value
+
+    def get_value(self, name):
+        with self.__lock:
+            return self.__values.get(name)
+
+    def send_message(self, message, source="RTDE Simulator", level=serialize.Message.INFO_MESSAGE):
+        """Send a text message to every connected client"""
+        for session in list(self.__sessions):
+            if session.protocol_version == 1:
+                payload = struct.pack(">B", level) + message.encode("utf-8")
+            else:
+                msg = message.encode("utf-8")
+                src = source.encode("utf-8")
+                fmt = ">B%dsB%dsB" % (len(msg), len(src))
+                payload = struct.pack(fmt, len(msg), msg, len(src), src, level)
+            self.__send(session, Command.RTDE_TEXT_MESSAGE, payload)
+
+    def __start_thread(self, target, *args):
+        thread = threading.Thread(target=target, args=args, name="rtde-simulator")
+        thread.daemon = True
+        thread.start()
+        self.__threads.append(thread)
+
+    def __accept_loop(self):
+        while self.__running.is_set():
+            try:
+                conn, _ = self.__listener.accept()
+            except socket.timeout:
+                continue
+            except socket.error:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            session = _Session(conn)
+            self.__sessions.append(session)
+            self.__start_thread(self.__serve, session)
+
+    def __serve(self, session):
+        buf = b""
+        deadline = None
+        tick = 0
+        try:
+            while self.__running.is_set():
+                period = self.__period(session)
+                timeout = 0.1
+                if deadline is not None:
+                    timeout = max(0.0, deadline - _clock()) if period else 0.0
+                readable, _, _ = select.select([session.conn], [], [], timeout)
+                if readable:
+                    data = session.conn.recv(65536)
+                    if not data:
+                        break
+                    buf = self.__handle_packets(session, buf + data)
+                if not session.started or session.output is None:
+                    deadline = None
+                    continue
+                now = _clock()
+                if deadline is None:
+                    deadline = now
+                if period == 0:
+                    tick = self.__send_data(session, tick, self.BURST)
+                elif now >= deadline:
+                    tick = self.__send_data(session, tick, 1)
+                    deadline += period
+                    if deadline < now - period:
+                        # fell behind, e.g. the client stopped reading
+                        deadline = now
+        except (socket.error, ValueError):
+            # connection closed by the client or by stop()
+            pass
+        finally:
+            self.__release_inputs(session)
+            self.__sessions.remove(session)
+            session.conn.close()
+
+    def __period(self, session):
+        frequency = self.frequency if self.frequency is not None else session.frequency
+        if not frequency:
+            return 0.0
+        return 1.0 / frequency
+
+    def __handle_packets(self, session, buf):
+        while len(buf) >= 3:
+            header = serialize.ControlHeader.unpack(buf)
+            if len(buf) < header.size:
+                break
+            payload, buf = buf[3 : header.size], buf[header.size :]
+            self.__on_packet(session, header.command, payload)
+        return buf
+
+    def __on_packet(self, session, cmd, payload):
+        if cmd == Command.RTDE_REQUEST_PROTOCOL_VERSION:
+            version = struct.unpack_from(">H", payload)[0]
+            accepted = version in (1, 2)
+            if accepted:
+                session.protocol_version = version
+            self.__send(session, cmd, struct.pack(">B", accepted))
+        elif cmd == Command.RTDE_GET_URCONTROL_VERSION:
+            self.__send(session, cmd, struct.pack(">IIII", *self.version))
+        elif cmd == Command.RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS:
+            if session.protocol_version >= 2:
+                session.frequency = struct.unpack_from(">d", payload)[0]
+                payload = payload[8:]
+            names = payload.decode("utf-8").split(",")
+            types = [get_variable_type(n) for n in names]
+            recipe_id = 0
+            if "NOT_FOUND" not in types:
+                recipe_id = self.__next_recipe_id(session)
+            reply = self.__recipe_reply(recipe_id, types)
+            if recipe_id:
+                session.output = self.__config(reply, names)
+            self.__send(session, cmd, reply)
+        elif cmd == Command.RTDE_CONTROL_PACKAGE_SETUP_INPUTS:
+            names = payload.decode("utf-8").split(",")
+            types = [get_variable_type(n, inputs=True) for n in names]
+            with self.__lock:
+                for i, name in enumerate(names):
+                    owner = self.__input_owners.get(name)
+                    if owner is not None and owner is not session:
+                        types[i] = "IN_USE"
+                recipe_id = 0
+                if "NOT_FOUND" not in types and "IN_USE" not in types:
+                    recipe_id = self.__next_recipe_id(session)
+                    for name in names:
+                        self.__input_owners[name] = session
+            reply = self.__recipe_reply(recipe_id, types)
+            if recipe_id:
+                session.inputs[recipe_id] = self.__config(reply, names)
+            self.__send(session, cmd, reply)
+        elif cmd == Command.RTDE_CONTROL_PACKAGE_START:
+            session.started = session.output is not None or len(session.inputs) > 0
+            self.__send(session, cmd, struct.pack(">B", session.started))
+        elif cmd == Command.RTDE_CONTROL_PACKAGE_PAUSE:
+            session.started = False
+            self.__send(session, cmd, struct.pack(">B", 1))
+        elif cmd == Command.RTDE_DATA_PACKAGE:
+            config = session.inputs.get(struct.unpack_from(">B", payload)[0])
+            if config is None:
+                _log.warning("RTDE simulator: data package for unknown input recipe")
+                return
+            state = config.unpack(payload)
+            with self.__lock:
+                for name in config.names:
+                    self.__values[name] = getattr(state, name)
+        elif cmd == Command.RTDE_TEXT_MESSAGE:
+            msg = serialize.Message.unpack(payload)
+            _log.info("RTDE simulator received: " + msg.message)
+        else:
+            _log.warning("RTDE simulator: unknown package command " + str(cmd))
+
+    def __next_recipe_id(self, session):
+        recipe_id = session.next_recipe_id
+        session.next_recipe_id += 1
+        return recipe_id
+
+    def __recipe_reply(self, recipe_id, types):
+        return struct.pack(">B", recipe_id) + ",".join(types).encode("utf-8")
+
+    def __config(self, reply, names):
+        config = serialize.DataConfig.unpack_recipe(reply)
+        config.names = names
+        return config
+
+    def __send_data(self, session, tick, count):
+        config = session.output
+        period = 1.0 / (session.frequency or 125.0)
+        # sample the value table once, only the timestamp changes per package
+        values = [config.id]
+        timestamp = None
+        with self.__lock:
+            for name, data_type in zip(config.names, config.types):
+                if name == "timestamp":
+                    timestamp = len(values)
+                value = self.__values.get(name)
+                if value is None:
+                    value = _default_value(data_type)
+                if data_type.startswith("VECTOR"):
+                    values.extend(value)
+                else:
+                    values.append(value)
+        header = struct.pack(">HB", 3 + config.codec.size, Command.RTDE_DATA_PACKAGE)
+        packages = []
+        for i in range(count):
+            if timestamp is None:
+                pass
+            elif self.host_timestamps:
+                values[timestamp] = _clock()
+            else:
+                values[timestamp] = (tick + i) * period
+            packages.append(header + config.codec.pack(*values))
+        with session.send_lock:
+            session.conn.sendall(b"".join(packages))
+        self.__sent_package_count += count
+        return tick + count
+
+    def __send(self, session, cmd, payload):
+        with session.send_lock:
+            session.conn.sendall(struct.pack(">HB", 3 + len(payload), cmd) + payload)
+
+    def __release_inputs(self, session):
+        with self.__lock:
+            for name, owner in list(self.__input_owners.items()):
+                if owner is session:
+                    del self.__input_owners[name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loopback RTDE controller")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=30004, help="port number (30004)")
+    parser.add_argument(
+        "--frequency",
+        type=float,
+        default=None,
+        help="override the requested frequency, 0 sends as fast as possible",
+    )
+    parser.add_argument(
+        "--host-timestamps",
+        help="send the time.monotonic() send time as timestamp",
+        action="store_true",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    simulator = RTDESimulator(
+        args.host, args.port, args.frequency, host_timestamps=args.host_timestamps
+    ).start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
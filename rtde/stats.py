@@ -0,0 +1,309 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import bisect
+import json
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:  # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+try:
+    clock = time.perf_counter
+except AttributeError:  # Python 2
+    clock = time.time
+
+# 10 us to 82 ms in powers of two, in seconds
+DEFAULT_BOUNDS = tuple(1e-5 * 2 ** i for i in range(14))
+# seconds of traffic the byte rates are averaged over, at least
+RATE_WINDOW = 5.0
+# packages waiting in the receive buffer
+BACKLOG_BOUNDS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class Histogram(object):
+    """Counts of values, by default durations in seconds, per bucket, cheap
+    enough to update on every data package. Bucket i counts values up to
+    bounds[i], the last bucket everything above.
+    """
+
+    __slots__ = ["bounds", "counts", "count", "total", "min", "max"]
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile, max for the
+        last bucket.
+        """
+        if not self.count:
+            return None
+        rank = self.count * q / 100.0
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.mean(),
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "bounds": list(self.bounds),
+            "counts": list(self.counts),
+        }
+
+
+class ConnectionStats(object):
+    """Counters of an RTDE connection, and with timing enabled histograms of
+    the time from socket read to decoded package, decode time, time from
+    receive() returning to the next send(), interval between package
+    arrivals and its deviation from the output period, and packages left in
+    the receive buffer when receive() returns. Byte rates cover the last
+    RATE_WINDOW to 2 * RATE_WINDOW seconds, the window moves on with the
+    traffic so taking snapshots does not change it.
+    """
+
+    HISTOGRAMS = ("read_to_decode", "decode", "turnaround", "inter_arrival", "jitter")
+
+    def __init__(self):
+        self.timing = False
+        self.period = None
+        self.reset()
+
+    def reset(self):
+        self.started = clock()
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.packages_received = 0
+        self.packages_sent = 0
+        self.packages_unchanged = 0
+        self.last_arrival = None
+        self.last_receive = None
+        self.rate_mark = (self.started, 0, 0)
+        self.previous_rate_mark = None
+        self.histograms = dict((name, Histogram()) for name in self.HISTOGRAMS)
+        self.histograms["backlog"] = Histogram(BACKLOG_BOUNDS)
+
+    def on_decoded(self, arrival, start, end):
+        """A data package read at arrival was decoded from start to end"""
+        histograms = self.histograms
+        histograms["decode"].record(end - start)
+        histograms["read_to_decode"].record(end - arrival)
+        if self.last_arrival is not None:
+            interval = arrival - self.last_arrival
+            histograms["inter_arrival"].record(interval)
+            if self.period is not None:
+                histograms["jitter"].record(abs(interval - self.period))
+        self.last_arrival = arrival
+
+    def on_decoded_batch(self, arrival, start, end, count):
+        """count data packages read at arrival were decoded together, as by
+        receive_batch(). Decode time is recorded per package, intervals
+        between reads are compared with the period of count packages.
+        """
+        histograms = self.histograms
+        histograms["decode"].record((end - start) / count)
+        histograms["read_to_decode"].record(end - arrival)
+        if self.last_arrival is not None and arrival != self.last_arrival:
+            interval = arrival - self.last_arrival
+            histograms["inter_arrival"].record(interval)
+            if self.period is not None:
+                histograms["jitter"].record(abs(interval - self.period * count))
+        self.last_arrival = arrival
+
+    def on_bytes(self, now, received=0, sent=0):
+        """Bytes read from or written to the socket at now"""
+        self.bytes_received += received
+        self.bytes_sent += sent
+        if now - self.rate_mark[0] >= RATE_WINDOW:
+            self.previous_rate_mark = self.rate_mark
+            self.rate_mark = (now, self.bytes_received, self.bytes_sent)
+
+    def on_receive(self, backlog):
+        self.histograms["backlog"].record(backlog)
+        self.last_receive = clock()
+
+    def on_send(self):
+        if self.last_receive is not None:
+            self.histograms["turnaround"].record(clock() - self.last_receive)
+            self.last_receive = None
+
+    def snapshot(self, skipped=0, dropped=0):
+        now = clock()
+        since, received, sent = self.previous_rate_mark or self.rate_mark
+        window = max(now - since, 1e-9)
+        result = {
+            "uptime": now - self.started,
+            "bytes_received": self.bytes_received,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received_per_second": (self.bytes_received - received) / window,
+            "bytes_sent_per_second": (self.bytes_sent - sent) / window,
+            "packages_received": self.packages_received,
+            "packages_sent": self.packages_sent,
+            "packages_unchanged": self.packages_unchanged,
+            "skipped_packages": skipped,
+            "dropped_packages": dropped,
+        }
+        if self.timing:
+            for name, histogram in self.histograms.items():
+                result[name] = histogram.to_dict()
+        return result
+
+
+def to_prometheus(snapshot, prefix="rtde", labels=None):
+    """Prometheus text exposition of a stats snapshot, or of a dictionary
+    from label value (e.g. robot host) to snapshot with labels=("robot",).
+    """
+    if labels is None:
+        snapshots = [("", snapshot)]
+    else:
+        snapshots = [
+            ('%s="%s"' % (labels[0], key), value)
+            for key, value in sorted(snapshot.items())
+        ]
+    lines = []
+    first = snapshots[0][1] if snapshots else {}
+    for name in sorted(first):
+        value = first[name]
+        if isinstance(value, dict):
+            unit = "packages" if name == "backlog" else "seconds"
+            metric = "%s_%s_%s" % (prefix, name, unit)
+            lines.append("# TYPE %s histogram" % metric)
+            for label, stats in snapshots:
+                _histogram_lines(lines, metric, label, stats[name])
+        else:
+            kind = "gauge"
+            metric = "%s_%s" % (prefix, name)
+            if name.startswith(("bytes_", "packages_")) and not name.endswith("second"):
+                kind = "counter"
+                metric += "_total"
+            elif name.endswith("_packages"):
+                kind = "counter"
+                metric = "%s_%s_total" % (prefix, name)
+            elif name == "uptime":
+                metric += "_seconds"
+            lines.append("# TYPE %s %s" % (metric, kind))
+            for label, stats in snapshots:
+                lines.append("%s%s %r" % (metric, _labels(label), float(stats[name])))
+    return "\n".join(lines) + "\n"
+
+
+def _labels(*labels):
+    labels = [label for label in labels if label]
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def _histogram_lines(lines, metric, label, histogram):
+    cumulative = 0
+    for bound, count in zip(histogram["bounds"], histogram["counts"]):
+        cumulative += count
+        le = 'le="%r"' % float(bound)
+        lines.append("%s_bucket%s %d" % (metric, _labels(label, le), cumulative))
+    le = 'le="+Inf"'
+    lines.append("%s_bucket%s %d" % (metric, _labels(label, le), histogram["count"]))
+    lines.append("%s_sum%s %r" % (metric, _labels(label), float(histogram["sum"])))
+    lines.append("%s_count%s %d" % (metric, _labels(label), histogram["count"]))
+
+
+class StatsServer(object):
+    """Serves stats over HTTP on a background thread, /metrics in Prometheus
+    text format and /stats as JSON. source returns a snapshot, e.g.
+    con.stats, or a dictionary from robot name to snapshot when labels is
+    given, see to_prometheus().
+    """
+
+    def __init__(self, source, host="127.0.0.1", port=9108, labels=None):
+        self.__thread = None
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/metrics":
+                    body = to_prometheus(source(), labels=labels)
+                    content_type = "text/plain; version=0.0.4"
+                elif path == "/stats":
+                    body = json.dumps(source(), sort_keys=True)
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                body = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.__httpd = HTTPServer((host, port), Handler)
+
+    @property
+    def port(self):
+        return self.__httpd.server_address[1]
+
+    def start(self):
+        self.__thread = threading.Thread(
+            target=self.__httpd.serve_forever, name="rtde-stats"
+        )
+        self.__thread.daemon = True
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        if self.__thread is not None:
+            self.__httpd.shutdown()
+            self.__thread.join()
+            self.__thread = None
+        self.__httpd.server_close()
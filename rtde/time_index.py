@@ -0,0 +1,263 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Reading a time window of a recording without loading all of it.
+
+Fixed-width binary recordings (record.py --binary or --columnar) are
+searched directly, their timestamps are memory-mapped and bisected. Text
+recordings get a sparse index next to the file, robot_data.csv.tsidx,
+holding the timestamp and byte offset of every interval-th row, so
+read_range() seeks to the window and parses only the rows around it.
+"""
+
+import argparse
+import itertools
+import os
+
+import numpy as np
+
+from . import record_file
+from .csv_binary_reader import BinaryReader, get_column_dtype
+
+DEFAULT_INDEX_INTERVAL = 1000
+INDEX_SUFFIX = ".tsidx"
+TIMESTAMP = "timestamp"
+
+# rows parsed at a time while looking for the end of a window
+_CHUNK_ROWS = 1000
+
+
+def get_index_filename(filename):
+    return filename + INDEX_SUFFIX
+
+
+def build_index(filename, interval=DEFAULT_INDEX_INTERVAL, delimiter=" "):
+    """Index a text recording, returns an array of (timestamp, offset) rows
+    and saves it next to the file.
+    """
+    separator = delimiter.encode("utf-8")
+    entries = []
+    with open(filename, "rb") as f:
+        header = f.readline()
+        column = _timestamp_column(header.decode("utf-8").split(delimiter))
+        offset = len(header)
+        row = 0
+        for line in f:
+            if line.strip():
+                if row % interval == 0:
+                    entries.append((float(line.split(separator)[column]), offset))
+                row += 1
+            offset += len(line)
+    index = np.array(entries, dtype=float).reshape(-1, 2)
+    stat = os.stat(filename)
+    with open(get_index_filename(filename), "w") as f:
+        f.write(
+            "# timestamp offset, every %d rows, size %d, mtime %r\n"
+            % (interval, stat.st_size, stat.st_mtime)
+        )
+        for timestamp, offset in entries:
+            f.write("%r %d\n" % (timestamp, offset))
+    return index
+
+
+def load_index(filename, delimiter=" "):
+    """The saved index of a text recording, or None if there is none or it
+    belongs to an earlier version of the file.
+    """
+    index_filename = get_index_filename(filename)
+    if not os.path.exists(index_filename):
+        return None
+    with open(index_filename) as f:
+        comment = f.readline().split()
+    if "size" not in comment or "mtime" not in comment:
+        return None
+    size = int(comment[comment.index("size") + 1].rstrip(","))
+    mtime = float(comment[comment.index("mtime") + 1])
+    index = np.loadtxt(index_filename, ndmin=2).reshape(-1, 2)
+    stat = os.stat(filename)
+    if stat.st_size == size and stat.st_mtime == mtime:
+        return index
+    if stat.st_size < size or len(index) == 0:
+        return None
+    # rows appended since indexing keep the index valid, a rewritten file
+    # has other rows at the indexed offsets
+    with open(filename, "rb") as f:
+        column = _timestamp_column(f.readline().decode("utf-8").split(delimiter))
+        f.seek(int(index[-1, 1]))
+        line = f.readline().split(delimiter.encode("utf-8"))
+    try:
+        if float(line[column]) == index[-1, 0]:
+            return index
+    except (IndexError, ValueError):
+        pass
+    return None
+
+
+def read_range(filename, start, end, fields=None, delimiter=" "):
+    """Samples of a recording with start <= timestamp <= end.
+    Returns a dictionary from field name to array, for all fields or the
+    given ones. Vector variables can be requested as a whole (target_q) or
+    by element (target_q_0). Text recordings are indexed on first use.
+    """
+    with open(filename, "rb") as f:
+        magic = f.read(len(record_file.MAGIC))
+        f.seek(0)
+        header = f.readline().decode("utf-8", "replace").rstrip("\n")
+        types = f.readline().decode("utf-8", "replace").rstrip("\n")
+    if magic == record_file.MAGIC:
+        return _read_record_range(filename, start, end, fields)
+    if _is_binary_header(header, types, delimiter):
+        return _read_binary_range(filename, start, end, fields, delimiter)
+    return _read_text_range(filename, start, end, fields, delimiter)
+
+
+def _timestamp_column(header):
+    header = [name.strip() for name in header]
+    if TIMESTAMP not in header:
+        raise ValueError("Recording has no timestamp field")
+    return header.index(TIMESTAMP)
+
+
+def _is_binary_header(header, types, delimiter):
+    """Whether the second line lists column types, as CSVBinaryWriter writes"""
+    try:
+        get_column_dtype(header.split(delimiter), types.split(delimiter))
+    except ValueError:
+        return False
+    return True
+
+
+def _expand_fields(fields, header):
+    """Column names of the requested fields, vectors expanded to elements"""
+    columns = []
+    for field in fields:
+        if field in header:
+            columns.append(field)
+            continue
+        elements = list(
+            itertools.takewhile(
+                lambda name: name in header,
+                (field + "_" + str(i) for i in itertools.count()),
+            )
+        )
+        if not elements:
+            raise ValueError("Field not found in recording: " + field)
+        columns.append(elements)
+    return columns
+
+
+def _collect(fields, columns, values):
+    """Dictionary of fields from the expanded column names and column values"""
+    result = {}
+    for field, column in zip(fields, columns):
+        if isinstance(column, list):
+            result[field] = np.column_stack([values[name] for name in column])
+        else:
+            result[field] = values[column]
+    return result
+
+
+def _read_record_range(filename, start, end, fields):
+    reader = record_file.RecordReader(filename)
+    if fields is None:
+        fields = reader.names
+    timestamps = reader.timestamp
+    lo = np.searchsorted(timestamps, start, side="left")
+    hi = np.searchsorted(timestamps, end, side="right")
+    return dict((field, np.array(getattr(reader, field)[lo:hi])) for field in fields)
+
+
+def _read_binary_range(filename, start, end, fields, delimiter):
+    with open(filename, "rb") as f:
+        reader = BinaryReader(f, delimiter, mmap=True)
+    header = reader.get_header()
+    if fields is None:
+        fields = header
+    columns = _expand_fields(fields, header)
+    timestamps = reader.timestamp
+    lo = np.searchsorted(timestamps, start, side="left")
+    hi = np.searchsorted(timestamps, end, side="right")
+    data = reader.data[lo:hi]
+    return _collect(fields, columns, data)
+
+
+def _read_text_range(filename, start, end, fields, delimiter):
+    index = load_index(filename, delimiter)
+    if index is None:
+        index = build_index(filename, delimiter=delimiter)
+    with open(filename, "rb") as f:
+        header = [name.strip() for name in f.readline().decode("utf-8").split(delimiter)]
+        timestamp = _timestamp_column(header)
+        if fields is None:
+            fields = header
+        columns = _expand_fields(fields, header)
+        names = []
+        for column in columns:
+            names.extend(column if isinstance(column, list) else [column])
+        names = [name for i, name in enumerate(names) if name not in names[:i]]
+        usecols = [timestamp] + [header.index(name) for name in names]
+
+        # last indexed row before the window, rows appended after indexing
+        # are reached by reading on from the last entry
+        entry = np.searchsorted(index[:, 0], start, side="left") - 1
+        if entry >= 0:
+            f.seek(int(index[entry, 1]))
+
+        blocks = []
+        while True:
+            lines = [
+                line.decode("utf-8")
+                for line in itertools.islice(f, _CHUNK_ROWS)
+                if line.strip()
+            ]
+            if not lines:
+                break
+            block = np.loadtxt(
+                lines, delimiter=delimiter, usecols=usecols, ndmin=2, dtype=float
+            )
+            inside = (block[:, 0] >= start) & (block[:, 0] <= end)
+            blocks.append(block[inside])
+            if block[-1, 0] > end:
+                break
+
+    data = np.concatenate(blocks) if blocks else np.empty((0, len(usecols)))
+    values = dict((name, data[:, i + 1]) for i, name in enumerate(names))
+    return _collect(fields, columns, values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index a text recording by timestamp")
+    parser.add_argument("file", help="csv file written by record.py")
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=DEFAULT_INDEX_INTERVAL,
+        help="rows between index entries (%(default)s)",
+    )
+    args = parser.parse_args()
+    index = build_index(args.file, args.interval)
+    print("%d entries written to %s" % (len(index), get_index_filename(args.file)))
+
+
+if __name__ == "__main__":
+    main()
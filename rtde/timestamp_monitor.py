@@ -0,0 +1,162 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from collections import deque
+
+MAX_GAPS = 100  # gaps kept for inspection
+
+
+class TimestampMonitor(object):
+    """Checks the controller timestamp of every data package for missing
+    cycles and estimates the controller clock on the host clock.
+
+    host_time - timestamp is the clock offset plus a positive delay, so the
+    smallest value in every window of controller time is an offset sample.
+    A line fitted to the samples, older ones weighted down by forgetting per
+    window, gives the offset and the drift of the controller clock.
+    Host times are seconds of rtde.stats.clock, see update().
+    """
+
+    def __init__(self, frequency=125, window=1.0, forgetting=0.97):
+        if frequency <= 0:
+            raise ValueError("frequency must be positive: " + str(frequency))
+        self.period = 1.0 / frequency
+        self.window = window
+        self.forgetting = forgetting
+        self.reset()
+
+    def reset(self):
+        self.packages = 0
+        self.missed_cycles = 0
+        self.gap_count = 0
+        self.non_monotonic = 0
+        self.restarts = 0
+        self.gaps = deque(maxlen=MAX_GAPS)
+        self.last_timestamp = None
+        self.__restart_fit()
+
+    def __restart_fit(self):
+        self.__origin = None
+        self.__window_start = None
+        self.__window_min = None
+        self.__window_timestamp = None
+        self.__sums = [0.0] * 5
+        self.__offset = None
+        self.__drift = 0.0
+
+    def update(self, timestamp, host_time):
+        """Add a package with controller timestamp received at host_time,
+        returns the number of cycles missing before it.
+        """
+        missed = 0
+        last = self.last_timestamp
+        if last is not None:
+            delta = timestamp - last
+            if delta <= 0:
+                self.non_monotonic += 1
+                if delta == 0:
+                    # repeated package
+                    return 0
+                # restarted controller, its clock starts over
+                self.restarts += 1
+                self.__restart_fit()
+                delta = self.period
+            missed = int(round(delta / self.period)) - 1
+            if missed > 0:
+                self.missed_cycles += missed
+                self.gap_count += 1
+                self.gaps.append((last, timestamp, missed))
+            else:
+                missed = 0
+        self.last_timestamp = timestamp
+        self.packages += 1
+
+        delay = host_time - timestamp
+        if self.__window_start is None:
+            self.__window_start = timestamp
+            if self.__origin is None:
+                self.__origin = timestamp
+        if self.__window_min is None or delay < self.__window_min:
+            self.__window_min = delay
+            self.__window_timestamp = timestamp
+        if timestamp - self.__window_start >= self.window:
+            x = self.__window_timestamp - self.__origin
+            self.__add_sample(x, self.__window_min)
+            self.__window_start = None
+            self.__window_min = None
+        return missed
+
+    def __add_sample(self, x, y):
+        # weighted least squares of offset over controller time
+        sums = self.__sums
+        for i, value in enumerate((1.0, x, y, x * x, x * y)):
+            sums[i] = sums[i] * self.forgetting + value
+        weight, sx, sy, sxx, sxy = sums
+        variance = weight * sxx - sx * sx
+        if variance > 1e-12 * weight * weight:
+            self.__drift = (weight * sxy - sx * sy) / variance
+        else:
+            self.__drift = 0.0
+        self.__offset = (sy - self.__drift * sx) / weight
+
+    @property
+    def offset(self):
+        """Host time minus controller time at the first package since the
+        controller (re)started. Until the first window is complete this is
+        the smallest difference seen so far, None before any package.
+        """
+        if self.__offset is None:
+            return self.__window_min
+        return self.__offset
+
+    @property
+    def drift(self):
+        """Host seconds gained per controller second"""
+        return self.__drift
+
+    def to_host_time(self, timestamp):
+        """Host time of a controller timestamp, also for numpy arrays"""
+        offset = self.offset
+        if offset is None:
+            return None
+        return timestamp + offset + self.__drift * (timestamp - self.__origin)
+
+    def to_controller_time(self, host_time):
+        offset = self.offset
+        if offset is None:
+            return None
+        drift = self.__drift
+        return (host_time - offset + drift * self.__origin) / (1.0 + drift)
+
+    def get_stats(self):
+        expected = self.packages + self.missed_cycles
+        return {
+            "packages": self.packages,
+            "missed_cycles": self.missed_cycles,
+            "gaps": self.gap_count,
+            "loss": float(self.missed_cycles) / expected if expected else 0.0,
+            "non_monotonic": self.non_monotonic,
+            "restarts": self.restarts,
+            "offset": self.offset,
+            "drift_ppm": self.__drift * 1e6,
+        }
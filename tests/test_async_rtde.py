@@ -0,0 +1,107 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+
+import pytest
+
+from rtde.async_rtde import AsyncRTDE
+from rtde.simulator import RTDESimulator
+
+OUTPUTS = ["timestamp", "input_int_register_0"]
+
+
+@pytest.fixture
+def sim():
+    with RTDESimulator() as sim:
+        yield sim
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_receive_and_stream(sim):
+    async def main():
+        client = AsyncRTDE("127.0.0.1", sim.port)
+        await client.connect()
+        assert await client.get_controller_version() == sim.version
+        assert await client.send_output_setup(OUTPUTS, frequency=500)
+        assert await client.send_start()
+        first = await client.receive()
+        timestamps = []
+        async for state in client.stream():
+            timestamps.append(state.timestamp)
+            if len(timestamps) == 10:
+                break
+        assert timestamps[0] > first.timestamp
+        assert timestamps == sorted(timestamps)
+        assert await client.send_pause()
+        await client.disconnect()
+        assert not client.is_connected()
+
+    run(main())
+
+
+def test_send(sim):
+    async def main():
+        client = AsyncRTDE("127.0.0.1", sim.port)
+        await client.connect()
+        assert await client.send_output_setup(OUTPUTS, frequency=500)
+        inputs = await client.send_input_setup(["input_int_register_0"], ["INT32"])
+        assert await client.send_start()
+        inputs.input_int_register_0 = 5
+        assert await client.send(inputs)
+        for _ in range(50):
+            if (await client.receive()).input_int_register_0 == 5:
+                break
+        assert sim.get_value("input_int_register_0") == 5
+        assert await client.send_message(b"hello", b"test")
+        assert await client.send_message("hello")
+        await client.disconnect()
+
+    run(main())
+
+
+def test_setup_error_reaches_the_caller(sim):
+    async def main():
+        client = AsyncRTDE("127.0.0.1", sim.port)
+        await client.connect()
+        # the reply lists NOT_FOUND, which is not a data type
+        with pytest.raises(ValueError):
+            await client.send_output_setup(["no_such_variable"])
+        assert client.is_connected()
+        assert await client.send_output_setup(OUTPUTS, frequency=500)
+        await client.disconnect()
+
+    run(main())
+
+
+def test_connect_refused():
+    async def main():
+        client = AsyncRTDE("127.0.0.1", 1)
+        with pytest.raises(OSError):
+            await client.connect()
+        assert not client.is_connected()
+
+    run(main())
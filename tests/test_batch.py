@@ -0,0 +1,77 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import rtde.rtde as rtde
+from rtde.simulator import RTDESimulator
+
+FREQUENCY = 500
+OUTPUTS = ["timestamp", "actual_q", "input_int_register_0", "input_double_register_1"]
+OUTPUT_TYPES = ["DOUBLE", "VECTOR6D", "INT32", "DOUBLE"]
+
+
+@pytest.fixture
+def con():
+    with RTDESimulator() as sim:
+        sim.set_value("input_int_register_0", -3)
+        con = rtde.RTDE("127.0.0.1", sim.port)
+        con.connect()
+        assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, FREQUENCY)
+        yield con
+        con.disconnect()
+
+
+def test_receive_batch(con):
+    assert con.send_start()
+    time.sleep(0.1)
+    batch = con.receive_batch()
+    assert len(batch) > 10
+    assert batch["actual_q"].shape == (len(batch), 6)
+    assert np.all(batch["input_int_register_0"] == -3)
+    assert np.allclose(np.diff(batch["timestamp"]), 1.0 / FREQUENCY)
+
+
+def test_batches_continue_where_states_stop(con):
+    assert con.send_start()
+    time.sleep(0.1)
+    state = con.receive_buffered()
+    batch = con.receive_batch(max_packets=5)
+    assert len(batch) == 5
+    assert batch["timestamp"][0] == pytest.approx(state.timestamp + 1.0 / FREQUENCY)
+    rest = con.receive_batch()
+    assert rest["timestamp"][0] == pytest.approx(
+        batch["timestamp"][-1] + 1.0 / FREQUENCY
+    )
+
+
+def test_no_batch_while_the_receiver_runs(con):
+    assert con.send_start()
+    con.start_receiver()
+    with pytest.raises(rtde.RTDEException):
+        con.receive_batch()
+    con.stop_receiver()
@@ -0,0 +1,103 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import time
+
+import pytest
+
+import rtde.rtde as rtde
+from rtde.control_loop import TIMER_CLOCK, ControlLoop
+from rtde.simulator import RTDESimulator
+
+OUTPUTS = ["timestamp", "input_int_register_0"]
+OUTPUT_TYPES = ["DOUBLE", "INT32"]
+
+
+@pytest.fixture
+def sim():
+    with RTDESimulator() as sim:
+        yield sim
+
+
+def connect(sim, frequency):
+    con = rtde.RTDE("127.0.0.1", sim.port)
+    con.connect()
+    assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, frequency)
+    inputs = con.send_input_setup(["input_int_register_0"], ["INT32"])
+    assert con.send_start()
+    return con, inputs
+
+
+def test_packet_clock_sends_every_cycle(sim):
+    con, inputs = connect(sim, 250)
+    timestamps = []
+
+    def callback(state):
+        timestamps.append(state.timestamp)
+        inputs.input_int_register_0 = len(timestamps)
+        if len(timestamps) == 10:
+            time.sleep(0.02)
+        return inputs
+
+    loop = ControlLoop(con, callback, frequency=250)
+    try:
+        assert loop.run(cycles=50) == 50
+    finally:
+        con.disconnect()
+    assert sim.get_value("input_int_register_0") == 50
+    stats = loop.get_stats()
+    assert stats["jitter"]["count"] == 49
+    assert stats["turnaround"]["count"] == 50
+    # the slow cycle overran its 4 ms period by about 16 ms
+    assert stats["overruns"] >= 1
+    assert stats["overrun"]["count"] >= 1
+    assert stats["overrun"]["max"] >= 0.015
+
+
+def test_timer_clock_skips_stale_states(sim):
+    con, inputs = connect(sim, 50)
+    states = []
+    loop = ControlLoop(con, states.append, frequency=500, clock=TIMER_CLOCK)
+    try:
+        loop.run(cycles=10)
+    finally:
+        con.disconnect()
+    stats = loop.get_stats()
+    assert stats["cycles"] == 10
+    assert stats["stale"] > 0
+    timestamps = [state.timestamp for state in states]
+    assert len(set(timestamps)) == len(timestamps)
+
+
+def test_timer_clock_with_stale_states(sim):
+    con, inputs = connect(sim, 50)
+    states = []
+    loop = ControlLoop(
+        con, states.append, frequency=500, clock=TIMER_CLOCK, stale_states=True
+    )
+    try:
+        loop.run(cycles=20)
+    finally:
+        con.disconnect()
+    assert loop.get_stats()["stale"] == 0
+    assert len(set(state.timestamp for state in states)) < len(states)
@@ -0,0 +1,100 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+import pytest
+
+import rtde.rtde as rtde
+from rtde.csv_binary_reader import BinaryReader, get_column_dtype
+from rtde.csv_binary_writer import CSVBinaryWriter
+from rtde.simulator import RTDESimulator
+
+NAMES = ["timestamp", "actual_q", "runtime_state"]
+TYPES = ["DOUBLE", "VECTOR6D", "UINT32"]
+FREQUENCY = 500
+
+
+def record(sim, writer, count):
+    con = rtde.RTDE("127.0.0.1", sim.port)
+    con.connect()
+    assert con.send_output_setup(NAMES, TYPES, FREQUENCY)
+    assert con.send_start()
+    written = 0
+    while written < count:
+        payload = con.receive_buffered(binary=True)
+        if payload is not None:
+            writer.writerow(payload)
+            written += 1
+    con.disconnect()
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """40 packages, the program running in the last 20"""
+    path = str(tmp_path / "robot_data.bin")
+    with RTDESimulator() as sim:
+        sim.set_value("actual_q", [0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+        with open(path, "wb") as f:
+            writer = CSVBinaryWriter(f, NAMES, TYPES)
+            writer.writeheader()
+            record(sim, writer, 20)
+            sim.set_value("runtime_state", 2)
+            record(sim, writer, 20)
+    return path
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_columns(recording, mmap):
+    with open(recording, "rb") as f:
+        reader = BinaryReader(f, mmap=mmap)
+    assert reader.get_samples() == 40
+    assert reader.get_header()[:3] == ["timestamp", "actual_q_0", "actual_q_1"]
+    assert reader.actual_q_5.dtype == np.dtype(">f8")
+    assert np.all(reader.actual_q_5 == 5.0)
+    assert reader.runtime_state.dtype == np.dtype(">u4")
+    assert np.allclose(np.diff(reader.timestamp[:20]), 1.0 / FREQUENCY)
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_filter_running_program(recording, mmap):
+    with open(recording, "rb") as f:
+        reader = BinaryReader(f, filter_running_program=True, mmap=mmap)
+    assert reader.get_samples() == 20
+    assert np.all(reader.runtime_state == 2)
+    assert len(reader.timestamp) == 20
+
+
+def test_truncated_record_is_ignored(recording):
+    with open(recording, "ab") as f:
+        f.write(b"\x00" * 10)
+    with open(recording, "rb") as f:
+        assert BinaryReader(f).get_samples() == 40
+
+
+def test_column_dtype():
+    dtype = get_column_dtype(["a", "b"], ["INT32", "UINT8"])
+    assert dtype == np.dtype([("a", ">i4"), ("b", "u1")])
+    with pytest.raises(ValueError):
+        get_column_dtype(["q"], ["VECTOR6D"])
+    with pytest.raises(ValueError):
+        get_column_dtype(["a", "b"], ["INT32"])
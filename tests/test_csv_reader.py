@@ -0,0 +1,117 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+import pytest
+
+import rtde.rtde as rtde
+from rtde import csv_reader
+from rtde.csv_reader import CSVReader
+from rtde.csv_writer import CSVWriter
+from rtde.simulator import RTDESimulator
+
+NAMES = ["timestamp", "actual_q", "runtime_state"]
+TYPES = ["DOUBLE", "VECTOR6D", "UINT32"]
+FREQUENCY = 500
+Q = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def record(sim, writer, count):
+    con = rtde.RTDE("127.0.0.1", sim.port)
+    con.connect()
+    assert con.send_output_setup(NAMES, TYPES, FREQUENCY)
+    assert con.send_start()
+    written = 0
+    while written < count:
+        state = con.receive_buffered()
+        if state is not None:
+            writer.writerow(state)
+            written += 1
+    con.disconnect()
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """50 rows, the program running in the last 20"""
+    path = str(tmp_path / "robot_data.csv")
+    with RTDESimulator() as sim:
+        sim.set_value("actual_q", Q)
+        with open(path, "w") as f:
+            writer = CSVWriter(f, NAMES, TYPES)
+            writer.writeheader()
+            record(sim, writer, 30)
+            sim.set_value("runtime_state", 2)
+            record(sim, writer, 20)
+    return path
+
+
+def test_load_in_chunks(recording, monkeypatch):
+    monkeypatch.setattr(csv_reader, "LOAD_CHUNK_ROWS", 7)
+    with open(recording) as f:
+        reader = CSVReader(f)
+    assert reader.get_samples() == 50
+    assert reader.get_header()[:2] == ["timestamp", "actual_q_0"]
+    assert np.allclose(np.diff(reader.timestamp[:30]), 1.0 / FREQUENCY)
+    assert np.all(reader.actual_q_5 == 5.0)
+    assert np.all(reader.runtime_state[30:] == 2)
+
+
+def test_iter_chunks(recording):
+    with open(recording) as f:
+        chunks = list(CSVReader.iter_chunks(f, rows=16, usecols=["timestamp"]))
+    assert [len(chunk["timestamp"]) for chunk in chunks] == [16, 16, 16, 2]
+    assert all(list(chunk) == ["timestamp"] for chunk in chunks)
+    with open(recording) as f:
+        with pytest.raises(ValueError):
+            list(CSVReader.iter_chunks(f, usecols=["no_such_column"]))
+
+
+def test_filter_running_program(recording, monkeypatch):
+    monkeypatch.setattr(csv_reader, "LOAD_CHUNK_ROWS", 7)
+    with open(recording) as f:
+        reader = CSVReader(f, filter_running_program=True, usecols=["timestamp"])
+    assert reader.get_samples() == 20
+    assert len(reader.timestamp) == 20
+    # columns loaded later get the same mask
+    assert np.all(reader.runtime_state == 2)
+    assert len(reader.actual_q_0) == 20
+    with open(recording) as f:
+        chunks = CSVReader.iter_chunks(
+            f, rows=16, usecols=["timestamp"], filter_running_program=True
+        )
+        assert sum(len(chunk["timestamp"]) for chunk in chunks) == 20
+
+
+def test_lazy_columns(recording):
+    with open(recording) as f:
+        reader = CSVReader(f, lazy=True)
+    assert "timestamp" not in vars(reader)
+    reader.materialize(["timestamp", "actual_q_1"])
+    assert "timestamp" in vars(reader)
+    assert "actual_q_0" not in vars(reader)
+    assert np.all(reader.actual_q_1 == 1.0)
+    assert len(reader.actual_q_0) == 50
+    with pytest.raises(AttributeError):
+        reader.no_such_column
+    with pytest.raises(ValueError):
+        reader.materialize(["no_such_column"])
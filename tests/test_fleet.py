@@ -0,0 +1,94 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+
+from rtde.fleet import RTDEFleet
+from rtde.simulator import RTDESimulator
+
+OUTPUTS = ["timestamp", "actual_q"]
+
+
+def test_fleet_skips_unreachable_robots():
+    with RTDESimulator() as first, RTDESimulator() as second:
+        hosts = [
+            ("127.0.0.1", first.port),
+            ("127.0.0.1", second.port),
+            ("127.0.0.1", 1),
+        ]
+
+        async def main():
+            fleet = RTDEFleet(hosts)
+            results = await fleet.connect()
+            assert isinstance(results[hosts[2]], OSError)
+            assert [c.is_connected() for c in fleet.clients.values()] == [
+                True,
+                True,
+                False,
+            ]
+            setup = await fleet.send_output_setup(OUTPUTS, frequency=500)
+            assert list(setup.values()) == [True, True]
+            assert all((await fleet.send_start()).values())
+
+            seen = set()
+            async for host, state in fleet.merged():
+                seen.add(host)
+                if len(seen) == 2:
+                    break
+            assert seen == set(hosts[:2])
+
+            ticks = []
+            async for timestamp, states in fleet.stream(period=0.01):
+                ticks.append(timestamp)
+                if len(ticks) == 10:
+                    break
+            assert ticks == sorted(ticks)
+            assert states[hosts[0]] is not None and states[hosts[1]] is not None
+            assert states[hosts[2]] is None
+
+            await fleet.send_pause()
+            await fleet.disconnect()
+            assert not fleet.is_connected()
+
+        asyncio.run(main())
+
+
+def test_stream_aligns_on_controller_timestamps():
+    with RTDESimulator() as sim:
+        host = ("127.0.0.1", sim.port)
+
+        async def main():
+            fleet = RTDEFleet([host])
+            await fleet.connect()
+            await fleet.send_output_setup(OUTPUTS, frequency=500)
+            await fleet.send_start()
+            await asyncio.sleep(0.2)
+            async for _, states in fleet.stream(period=0.01, lag=0.05):
+                aligned = states[host]
+                break
+            newest = fleet.get_latest_states()[host]
+            # about 25 packages older than the newest one
+            assert 0.03 < newest.timestamp - aligned.timestamp < 0.08
+            await fleet.disconnect()
+
+        asyncio.run(main())
@@ -0,0 +1,91 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+import pytest
+
+pytest.importorskip("h5py")
+
+import rtde.rtde as rtde
+from rtde.hdf5_writer import HDF5Writer, open_swmr
+from rtde.simulator import RTDESimulator
+
+NAMES = ["timestamp", "actual_q", "runtime_state"]
+TYPES = ["DOUBLE", "VECTOR6D", "UINT32"]
+FREQUENCY = 500
+Q = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+@pytest.fixture
+def con():
+    with RTDESimulator() as sim:
+        sim.set_value("actual_q", Q)
+        con = rtde.RTDE("127.0.0.1", sim.port)
+        con.connect()
+        assert con.send_output_setup(NAMES, TYPES, FREQUENCY)
+        assert con.send_start()
+        yield con
+        con.disconnect()
+
+
+def receive(con, count):
+    states = []
+    while len(states) < count:
+        state = con.receive_buffered()
+        if state is not None:
+            states.append(state)
+    return states
+
+
+def receive_block(con):
+    while True:
+        block = con.receive_batch()
+        if len(block):
+            return block
+
+
+def test_datasets_follow_the_recording(con, tmp_path):
+    path = str(tmp_path / "robot_data.h5")
+    with HDF5Writer(path, NAMES, TYPES, chunk_rows=32) as writer:
+        writer.writeheader()
+        writer.writerows(receive(con, 40))
+        # one full chunk was appended, the rest is pending
+        assert writer.get_samples() == 40
+        with open_swmr(path) as f:
+            assert f["timestamp"].shape == (32,)
+            assert f["actual_q"].shape == (32, 6)
+            assert f.attrs["names"] == ",".join(NAMES)
+
+            block = receive_block(con)
+            writer.write_block(block)
+            writer.writerows(receive(con, 5))
+            writer.flush()
+            samples = 45 + len(block)
+            assert writer.get_samples() == samples
+            for name in NAMES:
+                f[name].refresh()
+            timestamps = f["timestamp"][:]
+            assert len(timestamps) == samples
+            assert np.allclose(np.diff(timestamps), 1.0 / FREQUENCY)
+            assert np.all(f["actual_q"][:] == Q)
+            assert f["runtime_state"].dtype == np.uint32
@@ -0,0 +1,100 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+import rtde.rtde as rtde
+from rtde.parquet_reader import ParquetReader
+from rtde.parquet_writer import ParquetWriter
+from rtde.simulator import RTDESimulator
+
+NAMES = ["timestamp", "actual_q", "runtime_state"]
+TYPES = ["DOUBLE", "VECTOR6D", "UINT32"]
+FREQUENCY = 500
+Q = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+@pytest.fixture
+def con():
+    with RTDESimulator() as sim:
+        sim.set_value("actual_q", Q)
+        con = rtde.RTDE("127.0.0.1", sim.port)
+        con.connect()
+        assert con.send_output_setup(NAMES, TYPES, FREQUENCY)
+        assert con.send_start()
+        yield con
+        con.disconnect()
+
+
+def receive(con, count):
+    states = []
+    while len(states) < count:
+        state = con.receive_buffered()
+        if state is not None:
+            states.append(state)
+    return states
+
+
+def receive_block(con):
+    while True:
+        block = con.receive_batch()
+        if len(block):
+            return block
+
+
+def test_rows_and_row_groups(con, tmp_path):
+    path = str(tmp_path / "robot_data.parquet")
+    states = receive(con, 250)
+    with ParquetWriter(path, NAMES, TYPES, row_group_size=100) as writer:
+        writer.writeheader()
+        writer.writerows(states)
+    metadata = pq.ParquetFile(path).metadata
+    sizes = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    assert sizes == [100, 100, 50]
+
+    reader = ParquetReader(path)
+    assert reader.get_samples() == 250
+    assert reader.names == NAMES
+    assert np.allclose(np.diff(reader.timestamp), 1.0 / FREQUENCY)
+    assert reader.actual_q.shape == (250, 6)
+    assert np.all(reader.actual_q_5 == 5.0)
+    assert reader.runtime_state.dtype == np.uint32
+
+
+def test_blocks_and_rows_keep_their_order(con, tmp_path):
+    path = str(tmp_path / "robot_data.parquet")
+    with ParquetWriter(path, NAMES, TYPES, row_group_size=64) as writer:
+        for _ in range(3):
+            writer.write_block(receive_block(con))
+            writer.writerows(receive(con, 10))
+    reader = ParquetReader(path, columns=["timestamp"])
+    assert "timestamp" in vars(reader)
+    timestamps = reader.timestamp
+    assert np.all(np.diff(timestamps) > 0)
+    assert reader.get_samples() == len(timestamps) > 30
+    batches = list(reader.iter_batches(batch_size=16, columns=["actual_q"]))
+    assert sum(len(batch["actual_q"]) for batch in batches) == len(timestamps)
+    assert np.all(batches[0]["actual_q"] == Q)
@@ -0,0 +1,117 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import time
+
+import pytest
+
+import rtde.rtde as rtde
+from rtde.simulator import RTDESimulator
+
+FREQUENCY = 500
+OUTPUTS = ["timestamp", "actual_q", "input_int_register_0", "input_double_register_1"]
+OUTPUT_TYPES = ["DOUBLE", "VECTOR6D", "INT32", "DOUBLE"]
+
+
+@pytest.fixture
+def con():
+    with RTDESimulator() as sim:
+        con = rtde.RTDE("127.0.0.1", sim.port)
+        con.connect()
+        assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, FREQUENCY)
+        assert con.send_start()
+        yield con
+        con.disconnect()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_latest_state(con):
+    con.start_receiver()
+    assert con.is_receiver_running()
+    first = con.receive()
+    assert first is not None
+    assert wait_for(lambda: con.get_latest_state() is not first)
+    # receive() waits for a package newer than the last one it returned
+    assert con.receive().timestamp > first.timestamp
+    con.stop_receiver()
+    assert not con.is_receiver_running()
+    assert con.get_latest_state() is None
+
+
+def test_history_keeps_every_package(con):
+    con.start_receiver(history_size=1000)
+    time.sleep(0.1)
+    states = []
+    while len(states) < 40:
+        state = con.receive_buffered()
+        if state is not None:
+            states.append(state)
+    timestamps = [state.timestamp for state in states]
+    for previous, current in zip(timestamps, timestamps[1:]):
+        assert current == pytest.approx(previous + 1.0 / FREQUENCY)
+    assert con.dropped_package_count == 0
+    con.stop_receiver()
+
+
+def test_full_history_drops_the_oldest(con):
+    con.start_receiver(history_size=5)
+    assert wait_for(lambda: con.dropped_package_count > 0)
+    # the first package, timestamp 0, was dropped
+    assert con.receive_buffered().timestamp > 0
+    con.stop_receiver()
+
+
+def test_binary_receiver(con):
+    con.start_receiver(binary=True)
+    assert len(con.receive(binary=True)) == 68
+    with pytest.raises(rtde.RTDEException):
+        con.receive()
+    con.stop_receiver()
+
+
+def test_reconnect_after_receiver_lost_connection():
+    sim = RTDESimulator().start()
+    con = rtde.RTDE("127.0.0.1", sim.port)
+    con.connect()
+    assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, FREQUENCY)
+    assert con.send_start()
+    con.start_receiver()
+    assert con.receive() is not None
+    sim.stop()
+    assert wait_for(lambda: not con.is_receiver_running())
+
+    with RTDESimulator() as sim:
+        con.port = sim.port
+        con.connect()
+        assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, FREQUENCY)
+        assert con.send_start()
+        assert con.receive() is not None
+        con.disconnect()
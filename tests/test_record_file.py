@@ -0,0 +1,104 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+
+import numpy as np
+import pytest
+
+import rtde.rtde as rtde
+from rtde import record_file
+from rtde.simulator import RTDESimulator
+
+NAMES = ["timestamp", "actual_q", "runtime_state"]
+TYPES = ["DOUBLE", "VECTOR6D", "UINT32"]
+FREQUENCY = 500
+Q = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+@pytest.fixture
+def con():
+    with RTDESimulator() as sim:
+        sim.set_value("actual_q", Q)
+        con = rtde.RTDE("127.0.0.1", sim.port)
+        con.connect()
+        assert con.send_output_setup(NAMES, TYPES, FREQUENCY)
+        assert con.send_start()
+        yield con
+        con.disconnect()
+
+
+def receive(con, count, binary=False):
+    received = []
+    while len(received) < count:
+        state = con.receive_buffered(binary)
+        if state is not None:
+            received.append(state)
+    return received
+
+
+def test_payloads_states_and_blocks(con, tmp_path):
+    path = str(tmp_path / "robot_data.rec")
+    with open(path, "wb") as f:
+        writer = record_file.RecordWriter(f, NAMES, TYPES, {"frequency": FREQUENCY})
+        writer.writeheader()
+        assert f.tell() % 8 == 0
+        writer.writerows(receive(con, 10, binary=True))
+        writer.writerows(receive(con, 10))
+        block = con.receive_batch()
+        while not len(block):
+            block = con.receive_batch()
+        writer.write_block(block)
+
+    reader = record_file.RecordReader(path)
+    samples = 20 + len(block)
+    assert len(reader) == reader.get_samples() == samples
+    assert reader.names == NAMES
+    assert reader.types == TYPES
+    assert reader.metadata == {"frequency": FREQUENCY}
+    assert np.allclose(np.diff(reader.timestamp), 1.0 / FREQUENCY)
+    assert reader.actual_q.shape == (samples, 6)
+    assert np.all(reader.actual_q == Q)
+    assert np.all(reader.actual_q_2 == 2.0)
+    assert np.all(reader.runtime_state == 1)
+
+
+def test_truncated_record_is_ignored(tmp_path):
+    path = str(tmp_path / "robot_data.rec")
+    codec = record_file.get_record_struct(TYPES)
+    with open(path, "wb") as f:
+        writer = record_file.RecordWriter(f, NAMES, TYPES)
+        writer.writeheader()
+        writer.writerow(codec.pack(*([0.5] + Q + [2])))
+        f.write(b"\x00" * 10)
+    reader = record_file.RecordReader(path)
+    assert len(reader) == 1
+    assert reader.timestamp[0] == 0.5
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        record_file.read_header(io.BytesIO(b"timestamp actual_q_0\n"))
+    writer = record_file.RecordWriter(io.BytesIO(), NAMES, TYPES)
+    with pytest.raises(ValueError):
+        writer.writerow(b"\x00" * 10)
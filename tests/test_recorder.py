@@ -0,0 +1,83 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import time
+
+import pytest
+
+import rtde.rtde as rtde
+from rtde.csv_writer import CSVWriter
+from rtde.recorder import Recorder
+from rtde.simulator import RTDESimulator
+
+NAMES = ["timestamp", "actual_q"]
+TYPES = ["DOUBLE", "VECTOR6D"]
+
+
+@pytest.fixture
+def con():
+    with RTDESimulator() as sim:
+        con = rtde.RTDE("127.0.0.1", sim.port)
+        con.connect()
+        assert con.send_output_setup(NAMES, TYPES, 500)
+        assert con.send_start()
+        yield con
+        con.disconnect()
+
+
+class FailingWriter(object):
+    def writerow(self, state):
+        raise OSError("disk full")
+
+
+def test_records_every_package(con):
+    output = io.StringIO()
+    writer = CSVWriter(output, NAMES, TYPES)
+    writer.writeheader()
+    recorder = Recorder(con, writer, output, flush_interval=0.05, samples=200)
+    recorder.start()
+    deadline = time.time() + 5
+    while recorder.is_running() and time.time() < deadline:
+        time.sleep(0.01)
+    recorder.stop()
+    assert recorder.error is None
+    stats = recorder.get_stats()
+    assert stats["written"] == stats["received"] >= 200
+    assert stats["dropped"] == 0
+    rows = output.getvalue().splitlines()[1:]
+    timestamps = [float(row.split()[0]) for row in rows]
+    steps = [b - a for a, b in zip(timestamps, timestamps[1:])]
+    assert all(step == pytest.approx(0.002) for step in steps)
+
+
+def test_write_error_stops_recording(con):
+    recorder = Recorder(con, FailingWriter(), flush_interval=0.05)
+    recorder.start()
+    deadline = time.time() + 5
+    while recorder.is_running() and time.time() < deadline:
+        time.sleep(0.01)
+    assert not recorder.is_running()
+    recorder.stop()
+    assert isinstance(recorder.error, OSError)
+    assert recorder.get_stats()["written"] == 0
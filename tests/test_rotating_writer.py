@@ -0,0 +1,95 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import time
+
+import pytest
+
+import rtde.rtde as rtde
+from rtde import rotating_writer
+from rtde.simulator import RTDESimulator
+
+NAMES = ["timestamp", "actual_q"]
+TYPES = ["DOUBLE", "VECTOR6D"]
+
+
+@pytest.fixture
+def sim():
+    with RTDESimulator() as sim:
+        yield sim
+
+
+def record(sim, writer, names, types, rows, rotate_every):
+    con = rtde.RTDE("127.0.0.1", sim.port)
+    con.connect()
+    try:
+        assert con.send_output_setup(names, types, 500)
+        assert con.send_start()
+        deadline = time.time() + 5
+        written = 0
+        while written < rows and time.time() < deadline:
+            state = con.receive_buffered()
+            if state is None:
+                continue
+            writer.writerow(state)
+            written += 1
+            if written % rotate_every == 0:
+                writer.rotate()
+        assert written == rows
+    finally:
+        con.disconnect()
+
+
+def test_segments_and_index(sim, tmp_path):
+    writer = rotating_writer.RotatingWriter(
+        str(tmp_path / "robot_data.csv"), NAMES, TYPES, codec="gzip"
+    )
+    with writer:
+        record(sim, writer, NAMES, TYPES, rows=300, rotate_every=100)
+    segments = rotating_writer.read_index(writer.index_path)
+    assert [entry["rows"] for entry in segments] == [100, 100, 100]
+    assert all(entry["codec"] == "gzip" for entry in segments)
+    middle = segments[1]
+    with rotating_writer.open_segment(middle, "rt") as f:
+        lines = f.read().splitlines()
+    assert lines[0].split() == ["timestamp"] + ["actual_q_%d" % i for i in range(6)]
+    assert len(lines) == 101
+    assert float(lines[1].split()[0]) == middle["first_timestamp"]
+
+    start = middle["first_timestamp"]
+    end = middle["last_timestamp"]
+    found = rotating_writer.find_segments(writer.index_path, start, end)
+    assert [entry["segment"] for entry in found] == [middle["segment"]]
+    assert len(rotating_writer.find_segments(writer.index_path, end=start)) == 2
+
+
+def test_segments_without_timestamp_are_always_found(sim, tmp_path):
+    writer = rotating_writer.RotatingWriter(
+        str(tmp_path / "robot_data.csv"), ["actual_q"], ["VECTOR6D"], codec=None
+    )
+    with writer:
+        record(sim, writer, ["actual_q"], ["VECTOR6D"], rows=20, rotate_every=10)
+    segments = rotating_writer.read_index(writer.index_path)
+    assert segments[0]["first_timestamp"] is None
+    found = rotating_writer.find_segments(writer.index_path, 1.0, 2.0)
+    assert len(found) == 2
@@ -0,0 +1,116 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Sending input recipes to the simulator."""
+
+import logging
+import time
+
+import pytest
+
+import rtde.rtde as rtde
+import rtde.serialize as serialize
+from rtde.simulator import RTDESimulator
+
+
+@pytest.fixture
+def sim():
+    with RTDESimulator() as sim:
+        yield sim
+
+
+@pytest.fixture
+def con(sim):
+    con = rtde.RTDE("127.0.0.1", sim.port)
+    con.connect()
+    assert con.send_output_setup(["input_int_register_0"], ["INT32"], 500)
+    yield con
+    con.disconnect()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_send(sim, con):
+    inputs = con.send_input_setup(["input_int_register_0"], ["INT32"])
+    assert con.send_start()
+    inputs.input_int_register_0 = 42
+    assert con.send(inputs)
+    assert wait_for(lambda: sim.get_value("input_int_register_0") == 42)
+    assert wait_for(lambda: con.receive().input_int_register_0 == 42)
+
+
+def test_send_many(sim, con):
+    setp = con.send_input_setup(["input_double_register_1"], ["DOUBLE"])
+    watchdog = con.send_input_setup(["input_int_register_0"], ["INT32"])
+    assert con.send_start()
+    setp.input_double_register_1 = 2.5
+    watchdog.input_int_register_0 = 7
+    assert con.send_many((setp, watchdog))
+    assert wait_for(lambda: sim.get_value("input_double_register_1") == 2.5)
+    assert wait_for(lambda: sim.get_value("input_int_register_0") == 7)
+    assert con.stats()["packages_sent"] == 2
+
+
+def test_send_on_change(sim, con):
+    setp = con.send_input_setup(["input_double_register_1"], ["DOUBLE"])
+    watchdog = con.send_input_setup(["input_int_register_0"], ["INT32"])
+    con.set_send_on_change(setp)
+    con.set_send_on_change(watchdog, keep_alive=0.05)
+    assert con.send_start()
+    setp.input_double_register_1 = 1.0
+    watchdog.input_int_register_0 = 1
+    for _ in range(10):
+        assert con.send_many((setp, watchdog))
+    stats = con.stats()
+    assert stats["packages_sent"] == 2
+    assert stats["packages_unchanged"] == 18
+
+    setp.input_double_register_1 = 3.0
+    assert con.send(setp)
+    assert wait_for(lambda: sim.get_value("input_double_register_1") == 3.0)
+    time.sleep(0.06)
+    assert con.send(watchdog)
+    assert con.stats()["packages_sent"] == 4
+
+
+def test_send_many_rejects_a_recipe_twice(sim, con, caplog):
+    first = con.send_input_setup(["input_int_register_0"], ["INT32"])
+    second = serialize.DataObject.create_empty(
+        ["input_int_register_0"], first.recipe_id
+    )
+    assert con.send_start()
+    first.input_int_register_0 = 1
+    second.input_int_register_0 = 2
+    with caplog.at_level(logging.ERROR):
+        assert not con.send_many((first, second))
+    assert "sent twice" in caplog.text
+    assert con.stats()["packages_sent"] == 0
+    time.sleep(0.05)
+    assert sim.get_value("input_int_register_0") != 2
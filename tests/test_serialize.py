@@ -0,0 +1,74 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import pytest
+
+import rtde.rtde as rtde
+from rtde import serialize
+from rtde.simulator import RTDESimulator
+
+OUTPUTS = ["timestamp", "actual_q", "input_int_register_0"]
+OUTPUT_TYPES = ["DOUBLE", "VECTOR6D", "INT32"]
+
+
+@pytest.fixture
+def con():
+    with RTDESimulator() as sim:
+        sim.set_value("input_int_register_0", 7)
+        con = rtde.RTDE("127.0.0.1", sim.port)
+        con.connect()
+        assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, 500)
+        assert con.send_start()
+        yield con
+        con.disconnect()
+
+
+def test_received_states_are_records(con):
+    state = con.receive()
+    assert isinstance(state, serialize.DataFields)
+    assert isinstance(state, serialize.DataRecord)
+    assert not hasattr(state, "__dict__")
+    with pytest.raises(AttributeError):
+        state.unknown = 1
+    assert state.input_int_register_0 == 7
+    assert state.actual_q == [0.0] * 6
+    assert state.host_time is None
+
+
+def test_record_packs_like_a_data_object(con):
+    state = con.receive()
+    layout = serialize.get_field_layout(OUTPUT_TYPES)
+    data = tuple(state.pack(OUTPUTS, OUTPUT_TYPES, layout))
+    unpacked = serialize.DataObject.unpack(data, OUTPUTS, OUTPUT_TYPES, layout)
+    assert isinstance(unpacked, serialize.DataFields)
+    assert unpacked.__dict__ == {
+        "recipe_id": state.recipe_id,
+        "timestamp": state.timestamp,
+        "actual_q": state.actual_q,
+        "input_int_register_0": 7,
+    }
+
+
+def test_invalid_field_name():
+    with pytest.raises(ValueError):
+        serialize.DataObject.create_record_class(["not a name"], ((1, None),), 1)
@@ -0,0 +1,111 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""RTDE client against the loopback simulator, no robot needed.
+
+    python -m pytest tests
+"""
+
+import time
+
+import pytest
+
+import rtde.rtde as rtde
+from rtde.simulator import RTDESimulator
+
+FREQUENCY = 500
+OUTPUTS = ["timestamp", "actual_q", "input_int_register_0", "input_double_register_1"]
+OUTPUT_TYPES = ["DOUBLE", "VECTOR6D", "INT32", "DOUBLE"]
+
+
+@pytest.fixture
+def sim():
+    with RTDESimulator() as sim:
+        yield sim
+
+
+@pytest.fixture
+def con(sim):
+    con = rtde.RTDE("127.0.0.1", sim.port)
+    con.connect()
+    assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, FREQUENCY)
+    yield con
+    con.disconnect()
+
+
+def receive_all(con, count, receive):
+    states = []
+    deadline = time.time() + 2.0
+    while len(states) < count and time.time() < deadline:
+        state = receive()
+        if state is not None:
+            states.append(state)
+    return states
+
+
+def test_connect_and_setup(sim):
+    con = rtde.RTDE("127.0.0.1", sim.port)
+    con.connect()
+    assert con.is_connected()
+    assert con.get_controller_version() == sim.version
+    assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, FREQUENCY)
+    assert con.send_input_setup(["input_int_register_0"], ["INT32"]) is not None
+    assert con.send_start()
+    assert con.send_pause()
+    con.disconnect()
+    assert not con.is_connected()
+
+
+def test_receive(con):
+    assert con.send_start()
+    state = con.receive()
+    assert state.timestamp >= 0
+    assert state.actual_q == [0.0] * 6
+    assert con.receive().timestamp > state.timestamp
+
+
+def test_host_timestamps():
+    with RTDESimulator(host_timestamps=True) as sim:
+        con = rtde.RTDE("127.0.0.1", sim.port)
+        con.connect()
+        assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, FREQUENCY)
+        assert con.send_start()
+        state = con.receive()
+        assert 0 <= time.monotonic() - state.timestamp < 0.1
+        con.disconnect()
+
+
+def test_receive_binary(con):
+    assert con.send_start()
+    # payload without the recipe id: timestamp, actual_q, two registers
+    assert len(con.receive(binary=True)) == 8 + 48 + 4 + 8
+
+
+def test_receive_buffered_keeps_every_package(con):
+    assert con.send_start()
+    time.sleep(0.1)
+    states = receive_all(con, 50, con.receive_buffered)
+    assert len(states) == 50
+    timestamps = [state.timestamp for state in states]
+    for previous, current in zip(timestamps, timestamps[1:]):
+        assert current == pytest.approx(previous + 1.0 / FREQUENCY)
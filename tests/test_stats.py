@@ -0,0 +1,125 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import time
+
+try:
+    from urllib.request import urlopen
+except ImportError:  # Python 2
+    from urllib2 import urlopen
+
+import pytest
+
+import rtde.rtde as rtde
+from rtde import stats
+from rtde.simulator import RTDESimulator
+
+FREQUENCY = 500
+OUTPUTS = ["timestamp", "actual_q", "input_int_register_0", "input_double_register_1"]
+OUTPUT_TYPES = ["DOUBLE", "VECTOR6D", "INT32", "DOUBLE"]
+# header, recipe id and the fields above
+PACKAGE_SIZE = 3 + 1 + 8 + 48 + 4 + 8
+
+
+@pytest.fixture
+def con():
+    with RTDESimulator() as sim:
+        con = rtde.RTDE("127.0.0.1", sim.port)
+        con.connect()
+        assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, FREQUENCY)
+        yield con
+        con.disconnect()
+
+
+def receive_for(con, seconds):
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        con.receive_buffered()
+
+
+def test_histogram():
+    histogram = stats.Histogram(bounds=(1, 2, 4))
+    for value in (0.5, 1.5, 3, 3, 10):
+        histogram.record(value)
+    assert histogram.counts == [1, 1, 2, 1]
+    assert histogram.percentile(50) == 4
+    assert histogram.percentile(100) == 10
+    assert histogram.mean() == pytest.approx(3.6)
+
+
+def test_snapshot_only_reads(monkeypatch):
+    monkeypatch.setattr(stats, "RATE_WINDOW", 0.01)
+    connection = stats.ConnectionStats()
+    mark = connection.rate_mark
+    time.sleep(0.02)
+    connection.snapshot()
+    assert connection.rate_mark == mark
+    connection.on_bytes(stats.clock(), received=100)
+    assert connection.rate_mark[1:] == (100, 0)
+    assert connection.previous_rate_mark == mark
+
+
+def test_snapshots_do_not_move_the_rate_window(con, monkeypatch):
+    monkeypatch.setattr(stats, "RATE_WINDOW", 0.1)
+    assert con.send_start()
+    receive_for(con, 0.5)
+    rate = con.stats()["bytes_received_per_second"]
+    assert rate == pytest.approx(FREQUENCY * PACKAGE_SIZE, rel=0.3)
+    for _ in range(20):
+        con.stats()
+    receive_for(con, 0.01)
+    assert con.stats()["bytes_received_per_second"] == pytest.approx(rate, rel=0.3)
+
+
+def test_stats_with_packages_already_buffered(con):
+    assert con.send_start()
+    time.sleep(0.05)
+    con.receive_buffered()
+    time.sleep(0.05)
+    con.enable_stats()
+    con.enable_timestamp_monitor()
+    # decode from the buffer without reading the socket again
+    state = con.receive_buffered(buffer_limit=1)
+    assert state.host_time is not None
+    assert con.stats()["decode"]["count"] >= 1
+
+
+def test_prometheus_and_server(con):
+    con.enable_stats()
+    assert con.send_start()
+    receive_for(con, 0.1)
+    text = stats.to_prometheus({"ur5": con.stats()}, labels=("robot",))
+    assert "# TYPE rtde_packages_received_total counter" in text
+    assert 'rtde_decode_seconds_bucket{robot="ur5",le="+Inf"}' in text
+    assert 'rtde_backlog_packages_count{robot="ur5"}' in text
+
+    server = stats.StatsServer(con.stats, port=0).start()
+    try:
+        url = "http://127.0.0.1:%d" % server.port
+        metrics = urlopen(url + "/metrics").read().decode("utf-8")
+        assert "rtde_bytes_received_total " in metrics
+        snapshot = json.loads(urlopen(url + "/stats").read().decode("utf-8"))
+        assert snapshot["packages_received"] > 0
+    finally:
+        server.stop()
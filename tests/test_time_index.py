@@ -0,0 +1,134 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+
+import numpy as np
+import pytest
+
+import rtde.rtde as rtde
+from rtde import record_file, time_index
+from rtde.csv_binary_writer import CSVBinaryWriter
+from rtde.csv_writer import CSVWriter
+from rtde.simulator import RTDESimulator
+
+NAMES = ["timestamp", "actual_q", "runtime_state"]
+TYPES = ["DOUBLE", "VECTOR6D", "UINT32"]
+FREQUENCY = 500
+PERIOD = 1.0 / FREQUENCY
+Q = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def receive(count):
+    states = []
+    with RTDESimulator() as sim:
+        sim.set_value("actual_q", Q)
+        con = rtde.RTDE("127.0.0.1", sim.port)
+        con.connect()
+        assert con.send_output_setup(NAMES, TYPES, FREQUENCY)
+        assert con.send_start()
+        while len(states) < count:
+            state = con.receive_buffered()
+            if state is not None:
+                states.append(state)
+        con.disconnect()
+    return states
+
+
+def write_text(path, states):
+    with open(path, "w") as f:
+        writer = CSVWriter(f, NAMES, TYPES)
+        writer.writeheader()
+        for state in states:
+            writer.writerow(state)
+
+
+@pytest.fixture(scope="module")
+def states():
+    return receive(300)
+
+
+@pytest.fixture
+def recordings(states, tmp_path):
+    """The same states as text, binary csv and columnar recording"""
+    text = str(tmp_path / "robot_data.csv")
+    write_text(text, states)
+    columnar = str(tmp_path / "robot_data.rec")
+    with open(columnar, "wb") as f:
+        writer = record_file.RecordWriter(f, NAMES, TYPES)
+        writer.writeheader()
+        writer.writerows(states)
+    binary = str(tmp_path / "robot_data.bin")
+    codec = record_file.get_record_struct(TYPES)
+    with open(binary, "wb") as f:
+        writer = CSVBinaryWriter(f, NAMES, TYPES)
+        writer.writeheader()
+        for state in states:
+            # the payload, without the recipe id
+            writer.writerow(codec.pack(*state.pack(NAMES, TYPES)[1:]))
+    return text, binary, columnar
+
+
+def test_read_range(recordings, states):
+    start = states[100].timestamp
+    end = states[149].timestamp
+    time_index.build_index(recordings[0], interval=32)
+    for path in recordings:
+        window = time_index.read_range(path, start, end, ["timestamp", "actual_q"])
+        assert len(window["timestamp"]) == 50, path
+        assert window["timestamp"][0] == start
+        assert window["timestamp"][-1] == end
+        assert window["actual_q"].shape == (50, 6)
+        assert np.all(window["actual_q"] == Q)
+        elements = time_index.read_range(path, start, end, ["actual_q_2"])
+        assert np.all(elements["actual_q_2"] == 2.0)
+
+
+def test_text_index_is_built_on_first_use(recordings, states):
+    text = recordings[0]
+    assert time_index.load_index(text) is None
+    window = time_index.read_range(text, states[-1].timestamp, 1e9)
+    assert len(window["timestamp"]) == 1
+    assert os.path.exists(time_index.get_index_filename(text))
+    assert time_index.load_index(text) is not None
+
+
+def test_appended_rows_keep_the_index(recordings, states):
+    text = recordings[0]
+    time_index.build_index(text, interval=32)
+    with open(text, "a") as f:
+        writer = CSVWriter(f, NAMES, TYPES)
+        for state in states[:1]:
+            writer.writerow(state)
+    assert time_index.load_index(text) is not None
+
+
+def test_rewritten_file_gets_a_new_index(recordings, states):
+    text = recordings[0]
+    time_index.build_index(text, interval=32)
+    # the same size, other timestamps at the indexed offsets
+    write_text(text, states[::-1])
+    os.utime(text, (0, 0))
+    assert time_index.load_index(text) is None
+    window = time_index.read_range(text, states[0].timestamp, states[9].timestamp)
+    assert len(window["timestamp"]) == 10
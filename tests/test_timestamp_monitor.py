@@ -0,0 +1,93 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import time
+
+import pytest
+
+import rtde.rtde as rtde
+from rtde.simulator import RTDESimulator
+from rtde.timestamp_monitor import TimestampMonitor
+
+OUTPUTS = ["timestamp", "actual_q"]
+OUTPUT_TYPES = ["DOUBLE", "VECTOR6D"]
+
+
+@pytest.fixture
+def con():
+    with RTDESimulator() as sim:
+        con = rtde.RTDE("127.0.0.1", sim.port)
+        con.connect()
+        assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, 500)
+        yield con
+        con.disconnect()
+
+
+def feed(monitor, timestamps, offset, drift=0.0):
+    for timestamp in timestamps:
+        monitor.update(timestamp, timestamp * (1.0 + drift) + offset + 0.001)
+
+
+def test_monitor_counts_packages_receive_skips(con):
+    monitor = con.enable_timestamp_monitor()
+    assert con.send_start()
+    # receive() skips packages, which must not count as missing cycles
+    for _ in range(20):
+        con.receive()
+        time.sleep(0.005)
+    assert monitor.packages > 20
+    assert monitor.missed_cycles == 0
+
+
+def test_monitor_survives_a_setup_without_frequency(con):
+    con.enable_timestamp_monitor()
+    assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, 0)
+    assert con.timestamp_monitor is None
+    assert con.send_output_setup(OUTPUTS, OUTPUT_TYPES, 500)
+    assert con.timestamp_monitor is not None
+
+
+def test_gaps_and_clock_estimate():
+    monitor = TimestampMonitor(frequency=100)
+    timestamps = [i * 0.01 for i in range(1000) if not 500 <= i < 503]
+    feed(monitor, timestamps, offset=20.0, drift=50e-6)
+    stats = monitor.get_stats()
+    assert stats["missed_cycles"] == 3
+    assert stats["gaps"] == 1
+    assert monitor.offset == pytest.approx(20.001, abs=1e-6)
+    assert stats["drift_ppm"] == pytest.approx(50, abs=1)
+    assert monitor.to_controller_time(monitor.to_host_time(5.0)) == pytest.approx(5.0)
+
+
+def test_restarted_controller_reanchors_the_fit():
+    monitor = TimestampMonitor(frequency=100)
+    feed(monitor, [i * 0.01 for i in range(500)], offset=20.0)
+    # the controller clock starts over, 1000 s later on the host
+    feed(monitor, [i * 0.01 for i in range(500)], offset=1020.0)
+    stats = monitor.get_stats()
+    assert stats["restarts"] == 1
+    assert stats["non_monotonic"] == 1
+    assert stats["missed_cycles"] == 0
+    assert stats["packages"] == 1000
+    assert monitor.last_timestamp == pytest.approx(4.99)
+    assert monitor.offset == pytest.approx(1020.001, abs=1e-6)